@@ -1,24 +1,41 @@
 
 import streamlit as st
-import requests
-import pandas as pd
+import hmac
+import json
 import random
 import os
-import backup_service
-import smtplib
-from email.mime.text import MIMEText
-from datetime import datetime
-from streamlit_gsheets import GSheetsConnection
+import threading
+import time
+import uuid
+import admission
+import district_index
+import district_lookup
+import district_resolver
+import email_service
+import metrics
+import pledge_snapshot
+import pledge_store
+import address_autocomplete
+import commit_queue
+import resilience
+import sheet_flusher
+import sheet_reconcile
+import sheets_io
+import tallies
 
 # --- CONFIGURATION ---
 # These keys are now securely loaded from your secrets.toml file
 GEOCODIO_API_KEY = st.secrets["GEOCODIO_API_KEY"]
 EMAIL_ADDRESS = "the.80.percent.bill@gmail.com"
 EMAIL_PASSWORD = st.secrets["EMAIL_PASSWORD"]
+email_service.configure(username=EMAIL_ADDRESS, password=EMAIL_PASSWORD)
 
 DONATION_LINK = "https://www.buymeacoffee.com/80percentbill" 
+ADDRESS_LOOKUP_ENABLED = True  # show the "look up my district by address" helper in step 1
+COMMIT_TIMEOUT = 10  # seconds a signer waits for the commit queue to acknowledge
 
 # --- SMART ASSET LOADER ---
+@st.cache_data
 def find_image(options):
     for img in options:
         if os.path.exists(img):
@@ -27,262 +44,148 @@ def find_image(options):
 
 LOGO_IMG = find_image(["Gemini_Generated_Image_1dkkh41dkkh41dkk.jpg", "logo.jpg", "logo.png"])
 
+# --- STATIC PAGE CONTENT (read and rendered once per process, not on every rerun) ---
+THEME_PATH = os.path.join("data", "theme.css")
+ARTICLES_PATH = os.path.join("data", "articles.json")
+
+@st.cache_data
+def page_css():
+    with open(THEME_PATH, encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+@st.cache_data
+def articles_html():
+    with open(ARTICLES_PATH, encoding="utf-8") as f:
+        articles = json.load(f)
+    blocks = []
+    for article in articles:
+        note_html = f"<div class='note-text'>{article['note']}</div>" if article["note"] else ""
+        blocks.append(f"""<div class="article-box"><div class="article-title">{article['title']}</div><div class="article-desc">{article['description']}</div>{note_html}<a href="{article['link']}" target="_blank" class="bill-link">🏛️ Read the Bill</a></div>""")
+    return "".join(blocks)
+
+@st.cache_resource
+def warm_up():
+    # Once per process, after the first page is out: import what later clicks need
+    # (altair for the leaderboard chart) on a background thread, so the first
+    # visitor's next click after a cold start doesn't pay for it
+    def run():
+        import altair  # noqa: F401
+    threading.Thread(target=run, name="warm-up", daemon=True).start()
+
 # --- HELPER FUNCTIONS ---
+@st.cache_resource
+def get_conn():
+    # One Google Sheets connection shared by every session and helper.
+    # streamlit_gsheets (gspread, google-auth...) is only imported on first use.
+    from streamlit_gsheets import GSheetsConnection
+    return st.connection("gsheets", type=GSheetsConnection)
+
+def client_id():
+    # Stable id for this browser session (used to debounce/limit per person)
+    if 'client_id' not in st.session_state:
+        st.session_state.client_id = uuid.uuid4().hex
+    return st.session_state.client_id
+
+def is_admin():
+    # Maintenance actions need the ADMIN_PASSWORD secret; without it they stay hidden
+    expected = st.secrets.get("ADMIN_PASSWORD")
+    if not expected:
+        return False
+    typed = st.text_input("Admin password", type="password", key="admin_password")
+    return bool(typed) and hmac.compare_digest(typed.encode(), str(expected).encode())
+
+@metrics.timed("get_osm_addresses")
 def get_osm_addresses(search_term):
     if not search_term: return []
-    url = "https://nominatim.openstreetmap.org/search"
-    headers = {"User-Agent": "The80PercentPledge/1.0"}
-    params = {"q": search_term, "format": "json", "limit": 5, "countrycodes": "us", "addressdetails": 1}
-    try:
-        response = requests.get(url, params=params, headers=headers)
-        if response.status_code == 200:
-            return response.json()
-    except:
-        return []
-    return []
-
-def get_district(address):
-    if not address: return None, None
-    url = "https://api.geocod.io/v1.7/geocode"
-    params = {"q": address, "fields": "cd", "api_key": GEOCODIO_API_KEY}
-    try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            results = response.json().get('results', [])
-            if results:
-                data = results[0]
-                if 'congressional_districts' in data['fields']:
-                    dist_data = data['fields']['congressional_districts'][0]
-                    state = data['address_components']['state']
-                    dist_num = dist_data['district_number']
-                    legislators = dist_data.get('current_legislators', [])
-                    rep_name = "Vacant"
-                    for leg in legislators:
-                        if leg['type'] == 'representative':
-                            rep = leg['bio']
-                            rep_name = f"{rep['first_name']} {rep['last_name']}"
-                            break
-                    return f"{state}-{dist_num}", rep_name
-    except:
-        return None, None
-    return None, None
-
+    # Cached, coalesced and rate-limited (Nominatim allows 1 request/second).
+    # None when the search is too busy to answer now.
+    return address_autocomplete.suggest(search_term)
+
+@metrics.timed("get_district")
+def get_district(address, lat=None, lon=None):
+    # With coordinates (e.g. from get_osm_addresses) try the offline resolver first: no network
+    offline_district = None
+    if lat is not None and lon is not None:
+        offline_district, rep_name = district_resolver.get_district(lat, lon)
+        if offline_district and rep_name:
+            return offline_district, rep_name
+    # Cached: repeat addresses are answered from memory/disk without a Geocodio call
+    district, rep_name = district_lookup.get_district(address, GEOCODIO_API_KEY, lat=lat, lon=lon)
+    if district is None and offline_district:
+        return offline_district, None
+    return district, rep_name
+
+@metrics.timed("is_duplicate")
 def is_duplicate(email):
-    # CHECKS GOOGLE SHEETS FOR DUPLICATES
-    try:
-        conn = st.connection("gsheets", type=GSheetsConnection)
-        # Read only the Email column (index 2) to be fast
-        df = conn.read(worksheet="Sheet1", usecols=[2], ttl=0)
-        if df is not None and not df.empty:
-            existing_emails = df.iloc[:, 0].astype(str).str.strip().str.lower().values
-            return email.strip().lower() in existing_emails
-    except Exception:
-        return False
-    return False
+    # CHECKS THE LOCAL PLEDGE STORE (SQLite UNIQUE index on the normalized email; no sheet read)
+    # Raises if the store isn't ready (e.g. the first-run import from the sheet failed),
+    # so a bad read never lets a duplicate through.
+    conn = get_conn()
+    return pledge_store.get_store().is_duplicate(conn, email)
 
+@metrics.timed("send_email_code")
 def send_email_code(to_email):
+    if not admission.allow_client("email", client_id()):
+        print("Email not queued (per-client limit hit)")
+        return None
+    if not admission.try_acquire("smtp"):
+        # Over the sending budget: a code that arrives hours later is no use, so skip verification
+        print("Email not queued (sending budget used up)")
+        return None
     code = str(random.randint(1000, 9999))
-    try:
-        msg = MIMEText(f"Your 80% Pledge verification code is: {code}")
-        msg['Subject'] = "Verification Code - The 80% Pledge"
-        msg['From'] = f"The 80% Pledge <{EMAIL_ADDRESS}>"
-        msg['To'] = to_email
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-            server.sendmail(EMAIL_ADDRESS, to_email, msg.as_string())
-        return code
-    except Exception as e:
+    # Queued for the email worker (kept-alive SMTP connection, paced to Gmail's limits).
+    # Returns right away; the delivery status is tracked in the session (see email_delivery_note).
+    msg_id = email_service.send(to_email, "Verification Code - The 80% Pledge",
+                                f"Your 80% Pledge verification code is: {code}")
+    if msg_id is None:
         # SILENT FAILURE: Return None so the app knows to skip verification
-        print(f"Email failed (likely limit hit): {e}") 
+        print("Email not queued (daily limit hit)")
         return None
-
-
+    st.session_state.email_msg_id = msg_id
+    return code
+
+def email_delivery_note():
+    # Shows where this session's verification email is (nothing if none was sent)
+    msg_id = st.session_state.get("email_msg_id")
+    state = email_service.status(msg_id) if msg_id else None
+    if state == "queued":
+        st.caption("Sending your verification email...")
+    elif state == "sent":
+        st.caption("Verification email sent. Check your inbox (and spam folder).")
+    elif state:
+        st.warning("We couldn't send your verification email. Please check the address and try again.")
+
+
+@metrics.timed("save_pledge")
 def save_pledge(name, email, district, rep_name):
-    # 1. Trigger the Backup Program FIRST (The Vault)
-    # This runs blindly so it saves data even if the main sheet fails.
-    backup_service.save_to_vault(name, email, district, rep_name)
-
-    # 2. Save to the Main Public Sheet
-    try:
-        conn = st.connection("gsheets", type=GSheetsConnection)
-        # Force a fresh download
-        existing_data = conn.read(worksheet="Sheet1", ttl=0)
-        
-        # --- CRITICAL SAFETY UPGRADE ---
-        # If the sheet returns EMPTY or very few rows, we assume a Read Error.
-        # Since you already have 150+ signatures, we set the floor to 50.
-        if existing_data is None or existing_data.empty:
-            st.error("⚠️ CRITICAL SAFETY LOCK: Database read returned 0 rows. Save aborted to protect data.")
-            return False
-            
-        if len(existing_data) < 50: 
-            st.error(f"⚠️ CRITICAL SAFETY LOCK: Database returned suspiciously few rows ({len(existing_data)}). Save aborted to protect data.")
-            return False
-        # -------------------------------
-
-        # Create the new row
-        new_row = pd.DataFrame([{
-            "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "Name": name,
-            "Email": email,
-            "District": district,
-            "Rep": rep_name
-        }])
-        
-        # Combine
-        updated_df = pd.concat([existing_data, new_row], ignore_index=True)
-        
-        # SAFETY CHECK 2: THE "ANTI-WIPE" LOCK (Redundant but kept for double safety)
-        if len(updated_df) < len(existing_data):
-            st.error(f"⚠️ SAFETY LOCK TRIGGERED: Attempted to delete data. (Old: {len(existing_data)}, New: {len(updated_df)})")
-            return False
-            
-        # Upload
-        conn.update(worksheet="Sheet1", data=updated_df)
-        return True
-        
-    except Exception as e:
-        st.error(f"⚠️ GOOGLE SHEETS ERROR: {e}")
-        # Return True anyway because we know the Backup Vault has the data
-        return True
+    # 1. Hand the row to the single-writer commit queue and wait for its acknowledgement.
+    # The writer saves it to the local pledge store (batched with anyone signing at the same moment).
+    conn = get_conn()
+    pledge_store.get_store().ensure_ready(conn)
+
+    ack = commit_queue.submit(sheets_io.new_row(name, email, district, rep_name))
+    with metrics.span("save_pledge.commit_wait"):
+        committed = ack.wait(COMMIT_TIMEOUT)
+    if not committed:
+        st.error("⚠️ SAVE ERROR: Saving took too long. Please try again.")
+        return False
+    if ack.duplicate:
+        st.error(f"❌ '{email}' has already signed.")
+        return False
+    if ack.error:
+        st.error(f"⚠️ SAVE ERROR: {ack.error}")
+        return False
+
+    # 2. The background flusher copies it to the Main Public Sheet and the Vault in batches,
+    # with retries, so the signer doesn't wait on Google.
+    return True
         
 # --- THE APP UI ---
 
 st.set_page_config(page_title="The 80% Bill", page_icon="🇺🇸", layout="wide")
 
 # --- CUSTOM THEME (FRESH START) ---
-st.markdown("""
-<style>
-    /* 1. FORCE LIGHT MODE BACKGROUND */
-    [data-testid="stAppViewContainer"] {
-        background-color: #F9F7F2;
-    }
-    [data-testid="stHeader"] {
-        background-color: #F9F7F2; 
-    }
-
-    /* 2. TEXT COLORS */
-    h1, h2, h3, h4, h5, h6, p, li, label, .stMarkdown {
-        color: #0C2340 !important;
-    }
-
-    /* 3. INPUT FIELDS */
-    input, textarea, select {
-        background-color: #ffffff !important;
-        color: #000000 !important;
-        border: 1px solid #ccc !important;
-        caret-color: #000000 !important;
-    }
-    ::placeholder {
-        color: #666666 !important;
-        opacity: 1;
-    }
-
-    /* 4. BUTTONS (Standard Buttons) */
-    button {
-        background-color: #0C2340 !important;
-        border: none !important;
-        transition: background-color 0.3s ease;
-    }
-    button * {
-        color: #ffffff !important;
-    }
-    button:hover {
-        background-color: #BF0A30 !important;
-    }
-
-    /* Main Page Buttons (Navy) */
-    [data-testid="stLinkButton"] {
-        background-color: #0C2340 !important;
-        color: #ffffff !important;
-    }
-    [data-testid="stLinkButton"] p { color: #ffffff !important; }
-
-    /* SIDEBAR ONLY OVERRIDE (Yellow) */
-    [data-testid="stSidebar"] [data-testid="stLinkButton"] {
-        background-color: #FFDD00 !important; /* Bright Yellow */
-        color: #000000 !important;            /* Black Text */
-    }
-    [data-testid="stSidebar"] [data-testid="stLinkButton"] p {
-        color: #000000 !important;            /* Force Black Text */
-    }
-
-    /* --- SIDEBAR THEME --- */
-    
-    /* 1. Make the Sidebar Background Navy Blue */
-    [data-testid="stSidebar"] {
-        background-color: #0C2340 !important;
-    }
-
-    /* 2. Make All Sidebar Text White (Headers & Paragraphs) */
-    [data-testid="stSidebar"] h1, 
-    [data-testid="stSidebar"] h2, 
-    [data-testid="stSidebar"] h3, 
-    [data-testid="stSidebar"] p, 
-    [data-testid="stSidebar"] label,
-    [data-testid="stSidebar"] .stMarkdown {
-        color: #ffffff !important;
-    }
-
-    /* 3. Sidebar Divider Line (Make it white/light so it shows up) */
-    [data-testid="stSidebar"] hr {
-        border-color: #ffffff !important;
-    }
-    
-    /* 4. Sidebar Buttons (Keep them Yellow/Black for contrast) */
-    [data-testid="stSidebar"] [data-testid="stLinkButton"] {
-        background-color: #FFDD00 !important;
-        color: #000000 !important;
-    }
-    [data-testid="stSidebar"] [data-testid="stLinkButton"] p {
-        color: #000000 !important;
-    }
-
-    /* 6. TABS */
-    [data-testid="stTabs"] {
-        background-color: transparent;
-    }
-    [data-testid="stMarkdownContainer"] p {
-        font-weight: bold;
-    }
-
-    /* 7. ARTICLE BOXES */
-    .article-box {
-        background-color: #ffffff; 
-        padding: 20px; 
-        border-radius: 8px; 
-        margin-bottom: 20px;
-        border-left: 6px solid #0C2340; 
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    .article-title { 
-        color: #0C2340 !important; 
-        font-size: 20px; 
-        font-weight: 800; 
-    }
-    .article-desc { 
-        color: #333333 !important; 
-        font-size: 16px; 
-    }
-    .note-text {
-        color: #555555 !important;
-        background-color: #eeeeee;
-        padding: 8px;
-        font-style: italic;
-        border-radius: 4px;
-    }
-    /* Custom Bill Links */
-    a.bill-link {
-        color: #ffffff !important;
-        background-color: #BF0A30;
-        padding: 8px 16px;
-        border-radius: 4px;
-        text-decoration: none;
-        display: inline-block;
-        margin-top: 10px;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(page_css(), unsafe_allow_html=True)
 
 # --- SIDEBAR ---
 with st.sidebar:
@@ -297,18 +200,113 @@ with st.sidebar:
     with st.expander("Admin Access"):
         if st.button("Check Connection"):
             try:
-                conn = st.connection("gsheets", type=GSheetsConnection)
-                df = conn.read(worksheet="Sheet1", ttl=0)
-                st.success(f"Connected! Total Signatures: {len(df)}")
+                conn = get_conn()
+                # Only fetch the header row; the count comes from the in-memory tallies
+                sheets_io.get_values(sheets_io.get_worksheet(conn), "A1:E1")
+                st.success(f"Connected! Total Signatures: {tallies.snapshot(top=0)['total']}")
             except Exception as e:
                 st.error(f"Connection Failed: {e}")
 
+        counts = tallies.snapshot(top=0)
+        if counts["reconciled_at"]:
+            st.write(f"Tallies: {counts['total']} signatures "
+                     f"(checked against the sheet {int(time.time() - counts['reconciled_at']) // 60} min ago)")
+
+        osm = address_autocomplete.stats()
+        st.write(f"Address search: {osm['hits'] + osm['prefix_hits']} cache hits, {osm['coalesced']} coalesced, "
+                 f"{osm['requests']} Nominatim requests")
+
+        mail = email_service.stats()
+        st.write(f"Email: {mail['sent_last_24h']} sent in 24h, {mail['queued']} queued, {mail['failed']} failed")
+
+        index = district_index.get_index().stats()
+        st.write(f"District index: {index['districts']} seats, {index['reps']} representatives "
+                 f"(refresh with `python district_index.py --refresh`)")
+
+        geo = district_lookup.stats()
+        st.write(f"Geocode cache: {geo['memory_hits'] + geo['disk_hits']} hits "
+                 f"({geo['disk_hits']} from disk), {geo['misses']} misses, {geo['api_calls']} API calls, "
+                 f"{geo['waiting']} waiting for budget")
+
+        # Timings of every step / external call since the app started
+        st.dataframe(metrics.summary(), hide_index=True)
+        st.download_button("Export metrics (Prometheus)", metrics.prometheus_text(),
+                           file_name="metrics.txt", mime="text/plain")
+
+        # Quota budgets and per-client limits (deferred = queued for later / turned away)
+        st.dataframe(admission.status(), hide_index=True)
+
+        # Outbound dependencies: an open circuit fails fast until its next probe
+        breakers = resilience.status()
+        for b in breakers:
+            if b["state"] != "closed":
+                st.warning(f"{b['dependency']}: circuit {b['state']} ({b['last_error']})")
+        st.dataframe(breakers, hide_index=True)
+
+        st.write(f"Primary store: {pledge_store.get_store().name}")
+        queue_stats = commit_queue.stats()
+        st.write(f"Commit queue: {queue_stats['rows']} saved in {queue_stats['commits']} commits "
+                 f"(largest batch {queue_stats['largest_batch']}, {queue_stats['waiting']} waiting)")
+
+        admin = is_admin()
+
+        # Pledge store -> Sheets mirror health
+        for target, state in sheet_flusher.status().items():
+            st.write(f"**{target}**: flushed through #{state['flushed_seq']}, sheet rows: {state['rows']}")
+            if state["error"]:
+                retry_note = " (write still running)" if state["in_flight"] else " (queued for retry)"
+                st.warning(f"{target}: {state['error']}{retry_note}")
+            if state["locked"] and admin and st.button(f"Resume {target} flushing", key=f"unlock_{target}"):
+                sheet_flusher.unlock(target)
+            elif state["locked"]:
+                st.caption(f"{target} flushing is locked; enter the admin password to resume it.")
+
+        # Main sheet vs vault: block checksums, only changed blocks are re-read.
+        # Both read the whole sheets (and repair writes), so admins only.
+        verify = admin and st.button("Verify main vs vault")
+        repair = admin and st.button("Copy missing rows between main and vault")
+        if verify or repair:
+            try:
+                sheet_reconcile.run(get_conn(),
+                                    st.secrets["BACKUP_URL"], apply=repair)
+            except Exception as e:
+                st.error(f"Reconcile failed: {e}")
+        report = sheet_reconcile.last_report()
+        if report:
+            checked = f"checked {int(time.time() - report.finished_at) // 60} min ago"
+            if report.in_sync:
+                st.write(f"Main and vault agree ({report.rows.get('main')} rows, {checked})")
+            else:
+                st.warning(f"Main and vault differ: {report.summary()} ({checked})")
+            if report.applied:
+                st.success(f"Copied rows: {report.applied}")
+
 # --- MAIN PAGE ---
 
 st.title("The 80% Bill")
 st.markdown(" ")
 
-tab1, tab2 = st.tabs(["Add Your Name", "Read the Bill"])
+# Keep the signature tallies fresh (rebuilds in the background at most every 15 minutes)
+try:
+    tallies.maybe_reconcile(get_conn)
+except Exception as e:
+    print(f"Tallies not reconciled: {e}")
+# ...and check that the vault still matches the main sheet (every 10 minutes)
+try:
+    sheet_reconcile.maybe_run(get_conn, st.secrets["BACKUP_URL"])
+except Exception as e:
+    print(f"Main/vault check not started: {e}")
+# ...keep the mirrors flushing: rows still pending after a restart (or loaded with
+# pledge_tool) go out without waiting for the next signer
+try:
+    # No vault secret still mirrors to the main sheet
+    sheet_flusher.start(get_conn, st.secrets.get("BACKUP_URL"))
+except Exception as e:
+    print(f"Sheet flusher not started: {e}")
+# ...and the columnar snapshot behind the Analytics tab (every 5 minutes, new rows only)
+pledge_snapshot.maybe_refresh()
+
+tab1, tab2, tab3, tab4 = st.tabs(["Add Your Name", "Read the Bill", "Leaderboard", "Analytics"])
 
 with tab1:
     if 'step' not in st.session_state: st.session_state.step = 1
@@ -326,21 +324,74 @@ with tab1:
             def_dist = st.session_state.district_info[0] if 'district_info' in st.session_state else ""
             def_rep = st.session_state.district_info[1] if 'district_info' in st.session_state else ""
 
+            # Optional: look the district up from a home address
+            if ADDRESS_LOOKUP_ENABLED:
+                with st.expander("Don't know your district? Look it up by address"):
+                    search = st.text_input("Home address:", placeholder="e.g. 123 Main St, Springfield IL")
+                    matches = get_osm_addresses(search)
+                    if matches:
+                        labels = [m.get("display_name", "") for m in matches]
+                        choice = st.selectbox("Pick your address:", range(len(labels)), format_func=lambda i: labels[i])
+                        if st.button("Use this address"):
+                            picked = matches[choice]
+                            if not admission.allow_client("lookup", client_id()):
+                                st.error("Too many lookups in a short time. Please wait a minute or enter your district below.")
+                            else:
+                                found_dist, found_rep = get_district(picked.get("display_name"), picked.get("lat"), picked.get("lon"))
+                                found_dist, found_rep = district_index.canonical(found_dist, found_rep)
+                                if found_dist:
+                                    st.session_state.district_info = (found_dist, found_rep)
+                                    st.rerun()
+                                elif district_lookup.is_deferred(picked.get("display_name")):
+                                    # Geocodio budget is used up for now; the lookup finishes in the background
+                                    st.info("Lookups are busy right now and yours is queued. "
+                                            "Press 'Use this address' again in a minute, or enter your district below.")
+                                else:
+                                    st.error("Couldn't find a district for that address. Please enter it below.")
+                    elif matches is None:
+                        st.caption("Address search is busy right now. Press Enter again in a moment, "
+                                   "or enter your district below.")
+                    elif search:
+                        st.caption("No matches yet. Try adding the city and state.")
+
             manual_dist = st.text_input("District Code:", value=def_dist, placeholder="e.g. NY-14")
+            # Checked against the bundled district index as they type: "ny14", "New York 14" -> NY-14
+            dist_code = district_index.normalize_district(manual_dist) if manual_dist else None
+            known_rep = district_index.rep_for(dist_code)
+            if manual_dist and dist_code is None:
+                st.caption("That isn't a district we know. Use the state and number, e.g. NY-14 (AK-AL for at-large seats).")
+            elif dist_code and dist_code != manual_dist.strip():
+                st.caption(f"Using **{dist_code}**" + (f", represented by {known_rep}" if known_rep else ""))
+            elif known_rep:
+                st.caption(f"Represented by {known_rep}")
             manual_rep = st.text_input("Representative Name:", value=def_rep, placeholder="e.g. Alexandria Ocasio-Cortez")
-            
+            # Close matches from the index when the name isn't an exact one
+            suggestions = district_index.suggest_reps(manual_rep, dist_code) if manual_rep else []
+            if suggestions and suggestions[0][0] != manual_rep.strip():
+                options = [name for name, _, _ in suggestions] + [manual_rep.strip()]
+                labels = [f"{name} ({code})" for name, code, _ in suggestions] + [f"Keep \"{manual_rep.strip()}\""]
+                manual_rep = options[st.selectbox("Did you mean:", range(len(options)), format_func=lambda i: labels[i])]
+
             if st.button("Continue to Sign"):
-                if manual_dist and manual_rep:
-                    st.session_state.district_info = (manual_dist, manual_rep)
+                conflict = district_index.conflicting_rep(dist_code, manual_rep) if dist_code else None
+                if not (manual_dist and (manual_rep or known_rep)):
+                    st.error("Please fill in both fields.")
+                elif dist_code is None:
+                    st.error("Please enter a valid district code, e.g. NY-14.")
+                elif conflict:
+                    st.error(f"{conflict[0]} represents {conflict[1]}, and {dist_code} is represented by "
+                             f"{known_rep}. Please check your district.")
+                else:
+                    # Always canonical: index codes, and the seat's current member when known
+                    st.session_state.district_info = district_index.canonical(dist_code, manual_rep)
                     st.session_state.step = 2
                     st.rerun()
-                else:
-                    st.error("Please fill in both fields.")
 
         # --- STEP 2: ENTER INFO & SAVE (NO EMAIL CODE) ---
         elif st.session_state.step == 2:
             dist, rep = st.session_state.district_info
             st.success(f"You are in **{dist}** represented by **{rep}**.")
+            email_delivery_note()
             
             if st.button("Wrong District? Change it."):
                 st.session_state.step = 1
@@ -352,19 +403,28 @@ with tab1:
                 email_input = st.text_input("Email Address")
                 
                 if st.form_submit_button("I will not vote for anyone who does not support this bill, unaltered"):
-                    if name and email_input and "@" in email_input:
+                    if not admission.allow_client("signup", client_id()):
+                        st.error("Too many signatures from this device in a short time. Please wait a few minutes and try again.")
+                    elif name and email_input and "@" in email_input:
                         clean_email = email_input.strip().lower()
                         
-                        # CHECK FOR DUPLICATES
-                        if is_duplicate(clean_email): 
+                        # CHECK FOR DUPLICATES (fails closed if the sheet can't be read)
+                        try:
+                            already_signed = is_duplicate(clean_email)
+                        except Exception as e:
+                            print(f"Duplicate check failed: {e}")
+                            already_signed = None
+
+                        if already_signed is None:
+                            st.error("⚠️ We couldn't reach the signature list right now. Please try again in a minute.")
+                        elif already_signed:
                             st.error(f"❌ '{clean_email}' has already signed.")
                         else:
                             # SAVE IMMEDIATELY (No Verification)
-                            save_pledge(name, clean_email, dist, rep)
-                            
-                            # Move to Success Screen
-                            st.session_state.step = 3
-                            st.rerun()
+                            if save_pledge(name, clean_email, dist, rep):
+                                # Move to Success Screen
+                                st.session_state.step = 3
+                                st.rerun()
                     else: st.error("Invalid email.")
 
         # --- STEP 3: SUCCESS SCREEN ---
@@ -380,110 +440,53 @@ with tab1:
 with tab2:
     st.markdown("# Every single article below is supported by at least 80% of American voters.")
     
-# FORMAT: (Title, Description, Link, Optional_Note)
-    articles = [
-
-        (
-            "I. Ban Congressional Stock Trading", 
-            "Prohibits Members, their spouses, and dependent children from owning or trading individual stocks. Requires full divestment or a qualified blind trust.", 
-            "https://www.congress.gov/bill/118th-congress/senate-bill/1171", None
-        ),
-        ("II. End Forever Wars", "Repeal outdated authorizations (AUMFs) to return war powers to Congress.", "https://www.congress.gov/bill/118th-congress/senate-bill/316", None),
-        ("III. Lifetime Lobbying Ban", "Former Members of Congress are banned for life from becoming registered lobbyists.", "https://www.congress.gov/bill/118th-congress/house-bill/1601", None),
-        ("IV. Tax the Ultra-Wealthy", "Close tax loopholes and establish a minimum tax for billionaires.", "https://www.congress.gov/bill/118th-congress/house-bill/6498", None),
-        (
-            "V. Ban Corporate PACs", 
-            "Prohibit for-profit corporations from forming Political Action Committees.", 
-            "https://www.congress.gov/bill/118th-congress/house-bill/5941", 
-            "Note: This legislation includes a 'severability clause.' If the Supreme Court strikes down this specific ban, the rest of the 80% Bill remains law."
-        ),
-        ("VI. Audit the Pentagon", "The Pentagon has never passed an audit. Require a full, independent audit to root out waste and fraud.", "https://www.congress.gov/bill/118th-congress/house-bill/2961", None),
-        (
-            "VII. Medicare Drug Negotiation", 
-            "1. H.R. 4895: Expands negotiation to 50 drugs/year and applies lower prices to private insurance.\\n2. H.R. 853: Closes the 'Orphan Drug' loophole.", 
-            "https://www.congress.gov/bill/118th-congress/house-bill/4895", 
-            "Note: This entry combines two bills to protect all Americans (not just seniors) and stop Big Pharma from gaming the 'rare disease' system."
-        ),
-        (
-            "VIII. Fair Elections & End Gerrymandering", 
-            "Pass the 'Freedom to Vote Act' to ban partisan gerrymandering and the 'John Lewis Act' to restore the Voting Rights Act.", 
-            "https://www.congress.gov/bill/117th-congress/house-bill/5746", None
-        ),
-        (
-            "IX. Protect US Farmland", 
-            "Ban adversarial foreign governments from buying American farmland. Includes a 'Beneficial Ownership' registry to stop shell companies.", 
-            "https://www.congress.gov/bill/118th-congress/house-bill/9456", None
-        ),
-
-        (
-            "X. Ban Corporate Purchase of Single Family Homes", 
-            "Imposes a massive tax penalty on corporations buying *existing* homes, making it unprofitable. Explicitly allows them to *build* new rental homes to increase supply.", 
-            "https://www.congress.gov/bill/118th-congress/senate-bill/3402", 
-            "Note: This uses an excise tax (not a ban) to bypass the 'Takings Clause' and forces hedge funds to sell existing homes over 10 years."
-        ),
-        (
-            "XI. Fund Social Security", 
-            "Lifts the cap on wages AND taxes investment income (Capital Gains) for earners over $400k. Prevents billionaires from dodging the tax by taking 'stock' instead of 'salary'.", 
-            "https://www.congress.gov/bill/118th-congress/senate-bill/1174", 
-            None
-        ),
-        (
-            "XII. Police Body Cameras", 
-            "Mandates cameras for federal officers and cuts funding to states that don't comply. Includes a 'Presumption of Release' clause so police can't hide footage.", 
-            "https://www.congress.gov/bill/117th-congress/house-bill/1280", 
-            None
-        ),
-        (
-            "XIII. Ban 'Dark Money' (Overturn Citizens United)", 
-            "A provision to overturn *Citizens United* and ban corporate dark money. Requires a 2/3rds vote to survive the Supreme Court.", 
-            "https://www.congress.gov/bill/118th-congress/house-joint-resolution/54", 
-            "Severability Note: This clause overturns Citizens United, but we acknowledge it will be struck down by the Court unless this bill passes with the votes required to amend the Constitution (2/3rds)."
-        ),
-        (
-            "XIV. Paid Family Leave", 
-            "Guarantees 12 weeks of paid leave funded by a payroll insurance fund. Explicitly prohibits firing workers (of any company size) for taking this leave.", 
-            "https://www.congress.gov/bill/118th-congress/house-bill/3481", 
-            None
-        ),
-        (
-           "XV. Release the Epstein Files", 
-            "Mandates the full, unredacted release of all documents, including those hidden by previous partial releases.", 
-            "https://www.congress.gov/bill/119th-congress/house-resolution/577", 
-            "Note: While some files were released in late 2025, many names were redacted. This resolution demands the immediate release of ALL documents without hiding names."
-        ),
-        (
-            "XVI. Veterans Care Choice", 
-            "Codifies the right to private care but mandates strict network adequacy standards so doctors actually accept the coverage. Cuts the red tape on 'Pre-Authorization'.", 
-            "https://www.congress.gov/bill/118th-congress/house-bill/8371", 
-            None
-        ),
-        (
-            "XVII. The DISCLOSE Act", 
-            "Requires immediate disclosure of donors ($10k+) and includes 'Trace-Back' rules to follow money through shell companies to the original source.", 
-            "https://www.congress.gov/bill/118th-congress/senate-bill/512", 
-            None
-        ),
-        (
-            "XVIII. Close Tax Loopholes", 
-            "Reclassifies 'Carried Interest' as ordinary income, regardless of holding period. Ensures hedge fund managers pay the same tax rate as nurses and teachers.", 
-            "https://www.congress.gov/bill/118th-congress/senate-bill/4123", 
-            None
-        ),
-        (
-            "XIX. Right to Repair (Ban 'Parts Pairing')", 
-            "Guarantees access to parts/manuals for cars AND electronics. Explicitly bans 'software pairing' that blocks genuine 3rd-party repairs.", 
-            "https://www.congress.gov/bill/118th-congress/house-bill/906", 
-            "Note: This entry combines the automotive 'REPAIR Act' (H.R. 906) with the 'Fair Repair Act' standards to stop companies from using software to kill independent repair."
-        ),
-        (
-            "XX. Ban Junk Fees", 
-            "Requires 'all-in' price disclosure for travel, tickets, and utilities. Prohibits companies from raising the price (dynamic pricing) once it is shown to the consumer.", 
-            "https://www.congress.gov/bill/118th-congress/house-bill/2463", 
-            None
-        )
-    ]
-
-    for title, desc, link, note in articles:
-        note_html = f"<div class='note-text'>{note}</div>" if note else ""
-        html_block = f"""<div class="article-box"><div class="article-title">{title}</div><div class="article-desc">{desc}</div>{note_html}<a href="{link}" target="_blank" class="bill-link">🏛️ Read the Bill</a></div>"""
-        st.markdown(html_block, unsafe_allow_html=True)
+    # Pre-rendered once per process from data/articles.json
+    st.markdown(articles_html(), unsafe_allow_html=True)
+
+with tab3:
+    # Read from the in-memory tallies: no sheet download per page view
+    counts = tallies.snapshot(top=20)
+    st.markdown(f"# {counts['total']:,} people have signed")
+    if counts["reconciled_at"] is None and counts["total"] == 0:
+        st.info("Counting signatures... check back in a moment.")
+    else:
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.subheader("Top Districts")
+            st.table([{"District": d, "Signatures": n} for d, n in counts["by_district"]])
+        with col_b:
+            st.subheader("Top Representatives")
+            st.table([{"Representative": r, "Signatures": n} for r, n in counts["by_rep"]])
+        st.subheader("By State")
+        st.bar_chart({state: n for state, n in counts["by_state"]})
+
+with tab4:
+    # Precomputed from the local snapshot: nothing is read or grouped per page view
+    stats = pledge_snapshot.analytics()
+    if stats is None:
+        st.info("Crunching the numbers... check back in a moment.")
+    else:
+        growth = f"{stats['growth_7d']:+.1f}% vs prior week" if stats["growth_7d"] is not None else None
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Total signatures", f"{stats['total']:,}")
+        m2.metric("Last 24 hours", f"{stats['last_24h']:,}")
+        m3.metric("Last 7 days", f"{stats['last_7d']:,}", growth)
+
+        st.subheader("Signatures over time")
+        st.line_chart(stats["daily"]["total"])
+        st.subheader("Signups per day")
+        st.bar_chart(stats["daily"][["signups", "7_day_avg"]].tail(60))
+        if len(stats["hourly"]):
+            st.subheader("Signups per hour (last 48 hours)")
+            st.bar_chart(stats["hourly"]["signups"])
+
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.subheader("By State")
+            st.dataframe(stats["by_state"])
+        with col_b:
+            st.subheader("By District")
+            st.dataframe(stats["by_district"])
+        st.caption(f"Updated {int(time.time() - stats['computed_at']) // 60} min ago.")
+
+warm_up()
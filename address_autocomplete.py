@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+import metrics
+import resilience
+
+# --- NOMINATIM ADDRESS AUTOCOMPLETE ---
+# Nominatim allows 1 request/second per app, so every lookup goes through:
+#   1. a result cache that also answers longer queries from a shorter cached
+#      prefix ("123 Main St" reuses "123 Main" when its results still match),
+#      but only when that prefix got fewer than RESULT_LIMIT results: a full
+#      list was cut off, so the address being typed may not be in it,
+#   2. coalescing, so sessions asking the same thing share one request,
+#   3. one global rate limiter and a shared keep-alive session. A lookup waits
+#      at most MAX_WAIT for its slot; past that the search is reported busy
+#      instead of holding the script thread for seconds.
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "The80PercentPledge/1.0"
+MIN_INTERVAL = 1.0      # seconds between requests to Nominatim (usage policy)
+MAX_WAIT = 2.0          # longest a lookup queues for a request slot
+MIN_CHARS = 4
+RESULT_LIMIT = 5
+CACHE_ENTRIES = 5000
+CACHE_TTL = 24 * 3600
+
+_session = None
+_session_lock = threading.Lock()
+_cache = OrderedDict()      # normalized query -> (results, stored_at)
+_in_flight = {}             # normalized query -> Future
+_lock = threading.Lock()
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
+_stats = {"hits": 0, "prefix_hits": 0, "coalesced": 0, "busy": 0, "requests": 0}
+
+
+def normalize_query(text):
+    return " ".join(str(text).lower().replace(",", " ").split())
+
+
+def suggest(text):
+    # Returns a list of Nominatim results (possibly empty), or None if too many
+    # lookups are already queued for Nominatim to take this one now.
+    query = normalize_query(text)
+    if len(query) < MIN_CHARS:
+        return []
+
+    cached = _from_cache(query)
+    if cached is not None:
+        return cached
+
+    with _lock:
+        future = _in_flight.get(query)
+        owner = future is None
+        if owner:
+            future = _in_flight[query] = Future()
+        else:
+            _stats["coalesced"] += 1
+    if not owner:
+        return future.result()
+
+    try:
+        results = _fetch(query)
+        future.set_result(results)
+    except Exception as e:
+        print(f"Nominatim lookup failed: {e}")
+        results = []
+        future.set_result(results)
+    finally:
+        with _lock:
+            _in_flight.pop(query, None)
+    return results
+
+
+def stats():
+    with _lock:
+        return dict(_stats, cached_queries=len(_cache))
+
+
+def _from_cache(query):
+    now = time.time()
+    with _lock:
+        entry = _cache.get(query)
+        if entry and now - entry[1] < CACHE_TTL:
+            _cache.move_to_end(query)
+            _stats["hits"] += 1
+            return entry[0]
+        # Longest cached prefix whose complete results still match every word typed so far
+        words = query.split()
+        for cut in range(len(query) - 1, MIN_CHARS - 1, -1):
+            entry = _cache.get(query[:cut].rstrip())
+            if not entry or now - entry[1] >= CACHE_TTL:
+                continue
+            if len(entry[0]) >= RESULT_LIMIT:
+                break
+            matches = [r for r in entry[0] if _matches(r, words)]
+            if matches:
+                _stats["prefix_hits"] += 1
+                return matches
+            break
+    return None
+
+
+def _matches(result, words):
+    haystack = normalize_query(result.get("display_name", "")).split()
+    # Every typed word must start some word of the address (the last one may be half-typed)
+    return all(any(h.startswith(w) for h in haystack) for w in words)
+
+
+def _fetch(query):
+    params = {"q": query, "format": "json", "limit": RESULT_LIMIT, "countrycodes": "us", "addressdetails": 1}
+    if not _wait_for_slot():
+        with _lock:
+            _stats["busy"] += 1
+        return None
+    # Fails fast (CircuitOpen) while Nominatim is down. No retry: it would need another
+    # slot, and the person can simply search again.
+    response = resilience.call("nominatim", _request, params, retries=0)
+    results = response.json() if response.status_code == 200 else []
+    if response.status_code == 200:
+        with _lock:
+            _cache[query] = (results, time.time())
+            _cache.move_to_end(query)
+            while len(_cache) > CACHE_ENTRIES:
+                _cache.popitem(last=False)
+    return results
+
+
+def _request(params):
+    with _lock:
+        _stats["requests"] += 1
+    with metrics.span("nominatim.request"):
+        response = _get_session().get(NOMINATIM_URL, params=params, timeout=resilience.timeout("nominatim"))
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()
+    return response
+
+
+def _wait_for_slot():
+    # Global limiter: requests leave at most once per MIN_INTERVAL, in arrival order.
+    # False (no slot taken) if the wait would be longer than MAX_WAIT.
+    global _next_request_at
+    with _rate_lock:
+        now = time.monotonic()
+        wait = _next_request_at - now
+        if wait > MAX_WAIT:
+            return False
+        _next_request_at = max(now, _next_request_at) + MIN_INTERVAL
+    if wait > 0:
+        time.sleep(wait)
+    return True
+
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            # Imported on first lookup, not at app start
+            import requests
+            from requests.adapters import HTTPAdapter
+            _session = requests.Session()
+            _session.headers["User-Agent"] = USER_AGENT
+            _session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        return _session
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+
+# --- ADMISSION CONTROL (TOKEN BUCKETS) ---
+# Shared budgets keep a traffic spike from burning a day's quota in a minute:
+# each refills at the rate the provider allows over the day and only lets a
+# small burst through at once. Callers decide what "no token" means:
+#   try_acquire(): request paths defer the work (flusher keeps rows pending,
+#                  Geocodio lookups go to a background queue) instead of failing,
+#                  or skip it when late is useless (verification emails)
+#   acquire():     background workers simply wait for the next token
+# Per-client buckets stop form spam, one per browser session. There's no per-IP
+# bucket: behind Streamlit Cloud's proxy every visitor has the same peer address.
+BUDGETS = {
+    # name: (tokens per second, burst)
+    "geocodio": (2500 / 86400, 50),        # free tier: 2,500 lookups/day
+    "smtp": (450 / 86400, 20),             # Gmail ~500/day (email_service.DAILY_LIMIT)
+    "sheets_write": (50 / 60, 20),         # Sheets API: 60 writes/min per user
+}
+CLIENT_LIMITS = {
+    # name: (tokens per second, burst) per client
+    "signup": (3 / 600, 3),                # 3 submissions, then one every ~3 minutes
+    "lookup": (10 / 60, 10),               # address searches / district lookups
+    "email": (2 / 600, 2),                 # verification emails
+}
+MAX_CLIENTS = 10000
+
+_buckets = {}
+_clients = OrderedDict()    # (limit name, client key) -> TokenBucket
+_stats = {}                 # name -> {"admitted": n, "deferred": n}
+_lock = threading.Lock()
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        # Caller holds self.lock
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, tokens=1):
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens=1):
+        # Seconds until `tokens` are available
+        with self.lock:
+            self._refill()
+            return max(0.0, (tokens - self.tokens) / self.rate)
+
+
+def bucket(name):
+    with _lock:
+        if name not in _buckets:
+            _buckets[name] = TokenBucket(*BUDGETS[name])
+        return _buckets[name]
+
+
+def try_acquire(name, tokens=1):
+    admitted = bucket(name).try_take(tokens)
+    _count(name, admitted)
+    return admitted
+
+
+def acquire(name, tokens=1, timeout=None):
+    # Blocks until the tokens are available (or timeout seconds pass); for background workers
+    deadline = None if timeout is None else time.monotonic() + timeout
+    b = bucket(name)
+    while not b.try_take(tokens):
+        wait = b.wait_time(tokens)
+        if deadline is not None and time.monotonic() + wait > deadline:
+            _count(name, False)
+            return False
+        time.sleep(min(wait, 5.0))
+    _count(name, True)
+    return True
+
+
+def allow_client(name, client):
+    # True if this browser session still has a token for this limit
+    rate, burst = CLIENT_LIMITS[name]
+    with _lock:
+        b = _clients.get((name, client))
+        if b is None:
+            b = _clients[(name, client)] = TokenBucket(rate, burst)
+        _clients.move_to_end((name, client))
+        while len(_clients) > MAX_CLIENTS:
+            _clients.popitem(last=False)
+    admitted = b.try_take()
+    _count(f"client.{name}", admitted)
+    return admitted
+
+
+def status():
+    rows = []
+    for name in BUDGETS:
+        b = bucket(name)
+        with b.lock:
+            b._refill()
+            tokens = b.tokens
+        with _lock:
+            counts = dict(_stats.get(name, {"admitted": 0, "deferred": 0}))
+        rows.append(dict(counts, budget=name, tokens=round(tokens, 1), burst=b.burst,
+                         per_hour=round(b.rate * 3600)))
+    with _lock:
+        for name in CLIENT_LIMITS:
+            counts = _stats.get(f"client.{name}", {"admitted": 0, "deferred": 0})
+            rows.append(dict(counts, budget=f"per client: {name}", tokens=None, burst=CLIENT_LIMITS[name][1],
+                             per_hour=round(CLIENT_LIMITS[name][0] * 3600)))
+    return rows
+
+
+def _count(name, admitted):
+    with _lock:
+        counts = _stats.setdefault(name, {"admitted": 0, "deferred": 0})
+        counts["admitted" if admitted else "deferred"] += 1
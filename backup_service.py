@@ -1,28 +1,13 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-from streamlit_gsheets import GSheetsConnection
+import metrics
+import sheets_io
 
-def save_to_vault(name, email, district, rep_name):
-    try:
+@metrics.timed("save_to_vault")
+def save_batch_to_vault(conn, rows, vault_url=None):
+    # Append just these rows (no full download/re-upload of the vault).
+    # Raises on failure so the sheet flusher can retry the batch.
+    if vault_url is None:
         vault_url = st.secrets["BACKUP_URL"]
-        conn = st.connection("gsheets", type=GSheetsConnection)
-        existing_data = conn.read(spreadsheet=vault_url, worksheet="Sheet1", ttl=0)
-        
-        new_row = pd.DataFrame([{
-            "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "Name": name,
-            "Email": email,
-            "District": district,
-            "Rep": rep_name
-        }])
-        
-        if existing_data is None: updated_df = new_row
-        else: updated_df = pd.concat([existing_data, new_row], ignore_index=True)
-
-        conn.update(spreadsheet=vault_url, worksheet="Sheet1", data=updated_df)
-        print("✅ Backup Saved.")
-        return True
-    except Exception as e:
-        print(f"❌ VAULT FAILURE: {e}")
-        return False
+    total = sheets_io.append_rows(conn, rows, spreadsheet=vault_url)
+    print(f"✅ Backup Saved. ({len(rows)} new, Vault rows: {total})")
+    return total
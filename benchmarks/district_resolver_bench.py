@@ -0,0 +1,74 @@
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import district_resolver
+
+# --- OFFLINE RESOLVER BENCHMARK ---
+# python benchmarks/district_resolver_bench.py            (synthetic 435-district map)
+# python benchmarks/district_resolver_bench.py --real     (data/cd_boundaries.geojson,
+#                                                         built from the Census file if missing)
+
+
+def synthetic_features(columns=29, rows=15, vertices_per_edge=60):
+    # 435 wavy-edged cells tiled over the continental US, roughly the vertex
+    # count of the Census 1:500k district shapes.
+    west, south, east, north = -125.0, 24.0, -66.0, 50.0
+    width, height = (east - west) / columns, (north - south) / rows
+    features = []
+    for i in range(columns):
+        for j in range(rows):
+            x0, y0 = west + i * width, south + j * height
+            ring = []
+            for k in range(vertices_per_edge):        # bottom edge, wavy
+                t = k / vertices_per_edge
+                ring.append((x0 + t * width, y0 + 0.02 * math.sin(t * 20)))
+            for k in range(vertices_per_edge):        # right edge
+                t = k / vertices_per_edge
+                ring.append((x0 + width, y0 + t * height))
+            for k in range(vertices_per_edge):        # top edge, wavy
+                t = k / vertices_per_edge
+                ring.append((x0 + (1 - t) * width, y0 + height + 0.02 * math.sin((1 - t) * 20)))
+            for k in range(vertices_per_edge):        # left edge
+                t = k / vertices_per_edge
+                ring.append((x0, y0 + (1 - t) * height))
+            ring.append(ring[0])
+            features.append((f"S{i:02d}-{j + 1}", {"type": "Polygon", "coordinates": [ring]}))
+    return features
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--real", action="store_true", help="use data/cd_boundaries.geojson")
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.real and not os.path.exists(district_resolver.BOUNDARIES_PATH):
+        features, points = district_resolver.build_boundaries()
+        print(f"built {district_resolver.BOUNDARIES_PATH}: {features} districts, {points} points")
+
+    start = time.perf_counter()
+    if args.real:
+        resolver = district_resolver.DistrictResolver.from_files()
+    else:
+        resolver = district_resolver.DistrictResolver(synthetic_features())
+    build = time.perf_counter() - start
+
+    rng = random.Random(80)
+    points = [(rng.uniform(24.5, 49.5), rng.uniform(-124.5, -66.5)) for _ in range(args.lookups)]
+    start = time.perf_counter()
+    found = sum(resolver.district_at(lat, lon) is not None for lat, lon in points)
+    elapsed = time.perf_counter() - start
+
+    print(f"districts: {len(resolver)}  polygon parts: {len(resolver.parts)}  grid cells: {len(resolver.grid)}")
+    print(f"index build: {build * 1000:.0f} ms")
+    print(f"lookups: {args.lookups} ({found} inside a district)")
+    print(f"{args.lookups / elapsed:,.0f} lookups/s, {elapsed / args.lookups * 1e6:.1f} us per lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import csv
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+
+# --- LOCAL STAND-INS FOR THE APP'S EXTERNAL SERVICES ---
+# FakeGSheetsConnection: in-memory (optionally CSV-seeded) stand-in for
+#   GSheetsConnection, with a fixed latency per call plus a per-row cost for
+#   calls that move the whole sheet.
+# FakeHTTPServices: one local HTTP server answering Geocodio's /v1.7/geocode
+#   and Nominatim's /search.
+# FakeSMTPServer: a minimal SMTP server that accepts and counts messages.
+COLUMNS = ["Timestamp", "Name", "Email", "District", "Rep"]
+
+
+class FakeWorksheet:
+    def __init__(self, rows=None, latency=0.0, per_row=0.0):
+        self.rows = [list(COLUMNS)] + [list(row) for row in (rows or [])]
+        self.latency = latency
+        self.per_row = per_row
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _wait(self, rows_moved=0):
+        self.calls += 1
+        time.sleep(self.latency + self.per_row * rows_moved)
+
+    def append_rows(self, values, **kwargs):
+        self._wait(len(values))
+        with self.lock:
+            first = len(self.rows) + 1
+            self.rows.extend([list(v) for v in values])
+            last = len(self.rows)
+        return {"updates": {"updatedRange": f"Sheet1!A{first}:E{last}"}}
+
+    def get_values(self, range_name=None, **kwargs):
+        # Supports the "C152:C" / "C2:E" style ranges the app uses
+        start, end = (range_name or "A1:E").split(":")
+        first_col = ord(start[0].upper()) - ord("A")
+        last_col = ord(end[0].upper()) - ord("A")
+        first_row = int(start[1:] or 1)
+        last_row = int(end[1:]) if end[1:] else None
+        with self.lock:
+            rows = self.rows[first_row - 1:last_row]
+        self._wait(len(rows))
+        return [row[first_col:last_col + 1] for row in rows]
+
+    def data_frame(self):
+        with self.lock:
+            return pd.DataFrame(self.rows[1:], columns=COLUMNS)
+
+
+class _FakeClient:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def _select_worksheet(self, spreadsheet=None, worksheet=None, folder_id=None):
+        return self.connection.sheet(spreadsheet)
+
+
+class FakeGSheetsConnection:
+    def __init__(self, rows=0, latency=0.05, per_row=0.0, csv_path=None):
+        self.latency = latency
+        self.per_row = per_row
+        self.sheets = {}
+        seed = _seed_rows(rows, csv_path)
+        self.sheets[None] = FakeWorksheet(seed, latency, per_row)
+        self.client = _FakeClient(self)
+
+    def sheet(self, spreadsheet=None):
+        if spreadsheet not in self.sheets:
+            # Every other spreadsheet (the vault) starts as a copy of the main sheet
+            self.sheets[spreadsheet] = FakeWorksheet(self.sheets[None].rows[1:], self.latency, self.per_row)
+        return self.sheets[spreadsheet]
+
+    # GSheetsConnection API used by the original full-sheet code path
+    def read(self, spreadsheet=None, worksheet=None, usecols=None, ttl=None, **kwargs):
+        ws = self.sheet(spreadsheet)
+        df = ws.data_frame()
+        ws._wait(len(df))
+        return df.iloc[:, usecols] if usecols else df
+
+    def update(self, spreadsheet=None, worksheet=None, data=None, **kwargs):
+        ws = self.sheet(spreadsheet)
+        ws._wait(len(data))
+        with ws.lock:
+            ws.rows = [list(COLUMNS)] + data[COLUMNS].astype(str).values.tolist()
+
+
+def _seed_rows(rows, csv_path):
+    if csv_path:
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            return [[row.get(c, "") for c in COLUMNS] for row in csv.DictReader(f)]
+    return [["2025-01-01 12:00:00", f"Seed {i}", f"seed{i}@example.com", f"NY-{i % 26 + 1}", f"Rep {i % 26 + 1}"]
+            for i in range(rows)]
+
+
+class FakeHTTPServices:
+    def __init__(self, latency=0.05):
+        handler = type("Handler", (_FakeHTTPHandler,), {"latency": latency})
+        server_class = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 256})
+        self.server = server_class(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def geocodio_url(self):
+        return self.url + "/v1.7/geocode"
+
+    @property
+    def nominatim_url(self):
+        return self.url + "/search"
+
+    def close(self):
+        self.server.shutdown()
+
+
+class _FakeHTTPHandler(BaseHTTPRequestHandler):
+    latency = 0.05
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query).get("q", [""])[0]
+        if url.path.endswith("/geocode"):
+            body = _geocodio_response(query)
+        else:
+            body = [{"display_name": f"{query}, Springfield, IL, USA", "lat": "39.78", "lon": "-89.65"}]
+        self._send(body)
+
+    def do_POST(self):
+        time.sleep(self.latency)
+        addresses = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self._send({"results": [{"query": a, "response": _geocodio_response(a)} for a in addresses]})
+
+    def _send(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _geocodio_response(query):
+    number = sum(map(ord, query)) % 18 + 1
+    return {"results": [{
+        "address_components": {"state": "IL"},
+        "location": {"lat": 39.78, "lng": -89.65},
+        "fields": {"congressional_districts": [{
+            "district_number": number,
+            "current_legislators": [{"type": "representative",
+                                     "bio": {"first_name": "Rep", "last_name": f"IL{number}"}}],
+        }]},
+    }]}
+
+
+class FakeSMTPServer:
+    def __init__(self, latency=0.0):
+        handler = type("Handler", (_SMTPHandler,), {"latency": latency, "owner": self})
+        self.messages = 0
+        self.lock = threading.Lock()
+        server_class = type("Server", (socketserver.ThreadingTCPServer,), {"request_queue_size": 256})
+        self.server = server_class(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    latency = 0.0
+    owner = None
+
+    def handle(self):
+        self._reply("220 fake-smtp ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self._reply("250 fake-smtp")
+            elif command.startswith("DATA"):
+                self._reply("354 end with .")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                time.sleep(self.latency)
+                with self.owner.lock:
+                    self.owner.messages += 1
+                self._reply("250 queued")
+            elif command.startswith("QUIT"):
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("250 ok")
+
+    def _reply(self, text):
+        self.wfile.write((text + "\r\n").encode())
@@ -0,0 +1,221 @@
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# --- SIGNING FLOW LOAD TEST ---
+# Simulates many people signing at once against local stand-ins (fakes.py) and
+# reports p50/p95/p99 latency per step, throughput and lost/duplicated rows.
+#
+#   python benchmarks/signing_load_test.py                       (full matrix)
+#   python benchmarks/signing_load_test.py --rows 10000 --sessions 100
+#   python benchmarks/signing_load_test.py --mode legacy         (old full-sheet rewrite path)
+#
+# Each scenario runs in its own process so the app's process-wide state
+# (dedup index, journal, queues) starts clean every time.
+DEFAULT_ROWS = [1000, 10000, 50000]
+DEFAULT_SESSIONS = [10, 100]
+
+
+def run_scenario(args):
+    import pandas as pd
+    import fakes
+    import address_autocomplete
+    import admission
+    import commit_queue
+    import district_lookup
+    import email_service
+    import pledge_store
+    import sheet_flusher
+    import sheets_io
+
+    workdir = tempfile.mkdtemp(prefix="pledge-bench-")
+    os.chdir(workdir)   # journal, checkpoints and caches are relative paths
+
+    conn = fakes.FakeGSheetsConnection(rows=args.rows, latency=args.latency, per_row=args.per_row)
+    http = fakes.FakeHTTPServices(latency=args.latency)
+    smtp = fakes.FakeSMTPServer()
+    district_lookup.GEOCODIO_URL = http.geocodio_url
+    address_autocomplete.NOMINATIM_URL = http.nominatim_url
+    email_service.configure("127.0.0.1", smtp.port, sender="bench@example.com", use_ssl=False)
+    email_service.PER_MINUTE_LIMIT = email_service.DAILY_LIMIT = 10 ** 9
+    admission.BUDGETS = {name: (10 ** 9, 10 ** 9) for name in admission.BUDGETS}
+    vault_url = "vault"
+    conn.sheet(vault_url)
+
+    # The same calls 80percentapp.py makes for each step, per-client limits included
+    # (the shared API budgets above are lifted so the fakes, not quotas, set the pace)
+    def get_osm_addresses(text):
+        return address_autocomplete.suggest(text)
+
+    def get_district(client, address):
+        if not admission.allow_client("lookup", client):
+            return "limited"
+        return district_lookup.get_district(address, "bench-key")
+
+    def send_email_code(client, email):
+        if not admission.allow_client("email", client) or not admission.try_acquire("smtp"):
+            return None
+        return email_service.send(email, "Verification Code - The 80% Pledge", "Your code is: 1234")
+
+    def is_duplicate(email):
+        if args.mode == "legacy":
+            df = conn.read(worksheet="Sheet1", usecols=[2], ttl=0)
+            return email in df.iloc[:, 0].astype(str).str.strip().str.lower().values
+        return pledge_store.get_store().is_duplicate(conn, email)
+
+    def save_pledge(name, email, district, rep):
+        row = sheets_io.new_row(name, email, district, rep)
+        if args.mode == "legacy":
+            for spreadsheet in (vault_url, None):
+                existing = conn.read(spreadsheet=spreadsheet, worksheet="Sheet1", ttl=0)
+                conn.update(spreadsheet=spreadsheet, worksheet="Sheet1",
+                            data=pd.concat([existing, pd.DataFrame([row])], ignore_index=True))
+            return True
+        sheet_flusher.start(lambda: conn, vault_url)
+        ack = commit_queue.submit(row)
+        return ack.wait(30) and ack.ok
+
+    timings = defaultdict(list)
+    accepted = []
+    errors = Counter()
+    outcomes = Counter()     # requests answered "busy" / turned away by a per-client limit
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.sessions)
+    emails = itertools.count()
+
+    def timed(step, fn, *fn_args):
+        start = time.perf_counter()
+        try:
+            return fn(*fn_args)
+        except Exception as e:
+            with lock:
+                errors[f"{step}: {type(e).__name__}"] += 1
+            return None
+        finally:
+            with lock:
+                timings[step].append(time.perf_counter() - start)
+
+    def session(n):
+        client = f"bench-session-{n}"
+        barrier.wait()
+        for k in range(args.signups):
+            i = next(emails)
+            # A share of submissions re-use an earlier email to exercise dedup
+            email = f"signer{i - 1 if k and i % 20 == 0 else i}@example.com"
+            address = f"{i} Main St, Springfield IL"
+            start = time.perf_counter()
+            if args.osm:
+                # Many people search the same few streets: exercises the cache and coalescing
+                if timed("get_osm_addresses", get_osm_addresses, f"{i % 50} Main St Springfield") is None:
+                    with lock:
+                        outcomes["autocomplete_busy"] += 1
+            if args.geo and timed("get_district", get_district, client, address) == "limited":
+                with lock:
+                    outcomes["lookup_limited"] += 1
+            if args.email and timed("send_email_code", send_email_code, client, email) is None:
+                with lock:
+                    outcomes["email_turned_away"] += 1
+            if not admission.allow_client("signup", client):
+                with lock:
+                    outcomes["signup_limited"] += 1
+            elif timed("is_duplicate", is_duplicate, email) is False:
+                if timed("save_pledge", save_pledge, f"Signer {i}", email, "IL-1", "Rep IL1"):
+                    with lock:
+                        accepted.append(email)
+            with lock:
+                timings["signup_total"].append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(args.sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    # Let the background flusher catch up before counting rows
+    deadline = time.time() + 120
+    while args.mode != "legacy" and time.time() < deadline:
+        if all(len(conn.sheet(s).rows) - 1 - args.rows >= len(accepted) for s in (None, vault_url)):
+            break
+        time.sleep(0.2)
+
+    result = {"mode": args.mode, "rows": args.rows, "sessions": args.sessions,
+              "signups": args.sessions * args.signups, "accepted": len(accepted),
+              "seconds": round(elapsed, 3), "signups_per_s": round(args.sessions * args.signups / elapsed, 1),
+              "errors": dict(errors), "outcomes": dict(outcomes), "steps": {}}
+    for step, values in timings.items():
+        values.sort()
+        result["steps"][step] = {p: round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 1)
+                                 for p, q in (("p50", .50), ("p95", .95), ("p99", .99))}
+    for name, spreadsheet in (("main", None), ("vault", vault_url)):
+        written = Counter(row[2] for row in conn.sheet(spreadsheet).rows[1 + args.rows:])
+        result[f"{name}_lost"] = len(set(accepted) - set(written))
+        result[f"{name}_duplicated"] = sum(n - 1 for n in written.values() if n > 1)
+    http.close()
+    smtp.close()
+    return result
+
+
+def print_result(r):
+    print(f"\n[{r['mode']}] {r['rows']:,} rows, {r['sessions']} sessions: {r['signups']} signups in {r['seconds']}s "
+          f"({r['signups_per_s']}/s), accepted {r['accepted']}")
+    for step, p in r["steps"].items():
+        print(f"  {step:16s} p50 {p['p50']:8.1f} ms   p95 {p['p95']:8.1f} ms   p99 {p['p99']:8.1f} ms")
+    print(f"  main: {r['main_lost']} lost, {r['main_duplicated']} duplicated   "
+          f"vault: {r['vault_lost']} lost, {r['vault_duplicated']} duplicated")
+    if r["outcomes"]:
+        print(f"  outcomes: {r['outcomes']}")
+    if r["errors"]:
+        print(f"  errors: {r['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, help="existing rows in Sheet1")
+    parser.add_argument("--sessions", type=int, help="concurrent signers")
+    parser.add_argument("--signups", type=int, default=3, help="signups per session")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake API call")
+    parser.add_argument("--per-row", type=float, default=2e-6, help="extra seconds per row moved")
+    parser.add_argument("--mode", choices=["current", "legacy"], default="current")
+    parser.add_argument("--no-osm", dest="osm", action="store_false")
+    parser.add_argument("--no-geo", dest="geo", action="store_false")
+    parser.add_argument("--no-email", dest="email", action="store_false")
+    parser.add_argument("--json", action="store_true", help="print one JSON result (used internally)")
+    args = parser.parse_args()
+
+    if args.rows is not None and args.sessions is not None:
+        result = run_scenario(args)
+        if args.json:
+            print("RESULT " + json.dumps(result), flush=True)
+        else:
+            print_result(result)
+        return
+
+    # Matrix: every scenario in a fresh process
+    for rows in [args.rows] if args.rows is not None else DEFAULT_ROWS:
+        for sessions in [args.sessions] if args.sessions is not None else DEFAULT_SESSIONS:
+            cmd = [sys.executable, os.path.abspath(__file__), "--rows", str(rows), "--sessions", str(sessions),
+                   "--signups", str(args.signups), "--latency", str(args.latency),
+                   "--per-row", str(args.per_row), "--mode", args.mode, "--json"]
+            cmd += [] if args.osm else ["--no-osm"]
+            cmd += [] if args.geo else ["--no-geo"]
+            cmd += [] if args.email else ["--no-email"]
+            out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+            line = next(l for l in out.splitlines() if l.startswith("RESULT "))
+            print_result(json.loads(line[len("RESULT "):]))
+
+
+if __name__ == "__main__":
+    main()
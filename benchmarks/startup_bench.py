@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# --- STARTUP / RERUN TIMING ---
+# Runs 80percentapp.py headless with Streamlit's AppTest and reports:
+#   import:  seconds to import streamlit itself (paid by every cold start)
+#   first:   the first script run in a fresh process (module imports, caches filling)
+#   rerun:   p50/p95 of later runs, which is what every click costs (measured
+#            after --settle seconds, so background warm-up started by the
+#            first run has finished, as it would before a person's next click)
+#
+#   python benchmarks/startup_bench.py
+#   python benchmarks/startup_bench.py --script /tmp/old_app.py   (compare another version)
+#
+# Each sample is a fresh process. Sheets credentials are dummies, so anything
+# that reaches Google fails fast and the app carries on, the same as when
+# Sheets is unreachable.
+SECRETS = {"GEOCODIO_API_KEY": "bench", "EMAIL_PASSWORD": "bench", "BACKUP_URL": "bench-vault"}
+
+
+def run_sample(script, reruns, settle):
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    imported = time.perf_counter()
+
+    at = AppTest.from_file(script, default_timeout=60)
+    for key, value in SECRETS.items():
+        at.secrets[key] = value
+    timings = []
+    for i in range(reruns + 1):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+        if i == 0:
+            time.sleep(settle)
+    errors = [str(e.value) for e in at.exception]
+    return {"import": imported - started, "first": timings[0], "reruns": timings[1:], "errors": errors}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--script", default=os.path.join(ROOT, "80percentapp.py"))
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--settle", type=float, default=3.0)
+    parser.add_argument("--json", action="store_true", help="run one sample and print its result (used internally)")
+    args = parser.parse_args()
+
+    if args.json:
+        result = run_sample(args.script, args.reruns, args.settle)
+        print("RESULT " + json.dumps(result))
+        return
+
+    script = os.path.abspath(args.script)
+    firsts, imports, reruns = [], [], []
+    for _ in range(args.samples):
+        # Fresh working dir (local stores, caches) with the app's data files
+        workdir = tempfile.mkdtemp(prefix="pledge-startup-")
+        if os.path.isdir(os.path.join(ROOT, "data")):
+            shutil.copytree(os.path.join(ROOT, "data"), os.path.join(workdir, "data"))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get("PYTHONPATH", "")]))
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--json", "--script", script,
+                                 "--reruns", str(args.reruns), "--settle", str(args.settle)],
+                                cwd=workdir, env=env, capture_output=True, text=True, check=True).stdout
+        line = next(l for l in output.splitlines() if l.startswith("RESULT "))
+        result = json.loads(line[len("RESULT "):])
+        if result["errors"]:
+            print(f"  script raised: {result['errors'][0][:200]}")
+        imports.append(result["import"])
+        firsts.append(result["first"])
+        reruns.extend(result["reruns"])
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    reruns.sort()
+    p95 = reruns[min(len(reruns) - 1, int(len(reruns) * 0.95))]
+    print(f"{os.path.basename(script)}: {args.samples} cold starts, {len(reruns)} reruns")
+    print(f"  import streamlit  {statistics.median(imports) * 1000:8.1f} ms")
+    print(f"  first run         {statistics.median(firsts) * 1000:8.1f} ms")
+    print(f"  rerun p50         {statistics.median(reruns) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import queue
+import threading
+import metrics
+import pledge_store
+import sheet_flusher
+import tallies
+
+# --- SINGLE-WRITER COMMIT QUEUE ---
+# Streamlit runs every session on its own thread. Instead of each one writing on
+# its own, sessions hand their row to this queue and wait for an Ack. One writer
+# thread drains whatever is waiting and commits the whole group to the pledge
+# store in one go (one transaction / one fsync); the store drops duplicate
+# emails and assigns sequence numbers.
+MAX_BATCH = 200
+LINGER_SECONDS = 0.005  # brief wait so near-simultaneous signers share one commit
+
+_queue = queue.Queue()
+_thread = None
+_lock = threading.Lock()
+_stats = {"commits": 0, "rows": 0, "duplicates": 0, "largest_batch": 0}
+
+
+class Ack:
+    def __init__(self, row):
+        self.row = row
+        self.seq = None
+        self.duplicate = False
+        self.error = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def ok(self):
+        return self._done.is_set() and self.seq is not None
+
+    def _finish(self, seq=None, duplicate=False, error=None):
+        self.seq, self.duplicate, self.error = seq, duplicate, error
+        self._done.set()
+
+
+def submit(row):
+    _ensure_writer()
+    ack = Ack(row)
+    _queue.put(ack)
+    return ack
+
+
+def stats():
+    with _lock:
+        return dict(_stats, waiting=_queue.qsize())
+
+
+def _ensure_writer():
+    global _thread
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_run, name="commit-writer", daemon=True)
+            _thread.start()
+
+
+def _next_batch():
+    batch = [_queue.get()]
+    try:
+        batch.append(_queue.get(timeout=LINGER_SECONDS))
+        while len(batch) < MAX_BATCH:
+            batch.append(_queue.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
+
+
+def _run():
+    while True:
+        batch = _next_batch()
+        try:
+            _commit(batch)
+        except Exception as e:
+            print(f"❌ COMMIT FAILURE: {e}")
+            for ack in batch:
+                if not ack.wait(0):
+                    ack._finish(error=e)
+
+
+@metrics.timed("commit.batch")
+def _commit(batch):
+    # Only this thread writes to the store, so the duplicate check and the
+    # insert can't interleave between sessions.
+    seqs = pledge_store.get_store().commit([ack.row for ack in batch])
+    accepted = []
+    for ack, seq in zip(batch, seqs):
+        if seq is None:
+            ack._finish(duplicate=True)
+        else:
+            tallies.record(ack.row, seq)
+            ack._finish(seq=seq)
+            accepted.append(ack)
+    if accepted:
+        sheet_flusher.wake()
+
+    with _lock:
+        _stats["commits"] += 1
+        _stats["rows"] += len(accepted)
+        _stats["duplicates"] += len(batch) - len(accepted)
+        _stats["largest_batch"] = max(_stats["largest_batch"], len(batch))
@@ -0,0 +1,98 @@
+import hashlib
+import threading
+import time
+import metrics
+import sheets_io
+
+# --- PROCESS-WIDE EMAIL DEDUP INDEX ---
+# Holds a hash of every normalized email in Sheet1. It is built once from the
+# sheet, updated by save_pledge as people sign, and topped up every
+# REFRESH_SECONDS by reading only the rows added since the last refresh.
+REFRESH_SECONDS = 60
+# If the sheet can't be read for this long we stop answering (fail closed)
+MAX_STALE_SECONDS = 600
+EMAIL_COLUMN = "C"
+
+_hashes = set()
+_rows_indexed = 0       # data rows of the sheet already folded into the index
+_refreshed_at = None    # monotonic time of the last successful sheet read
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+
+class IndexUnavailable(Exception):
+    pass
+
+
+def normalize_email(email):
+    return str(email).strip().lower()
+
+
+def email_hash(email):
+    # 16 bytes of SHA-256 is plenty to avoid collisions and keeps addresses out of memory
+    return hashlib.sha256(normalize_email(email).encode("utf-8")).digest()[:16]
+
+
+def contains(conn, email):
+    # O(1) duplicate check. Raises IndexUnavailable instead of guessing
+    # when the index was never built or is too stale to trust.
+    _ensure_fresh(conn)
+    with _lock:
+        return email_hash(email) in _hashes
+
+
+def seen(email):
+    # Index-only lookup (no refresh), for the commit writer
+    with _lock:
+        return email_hash(email) in _hashes
+
+
+def add(email):
+    with _lock:
+        _hashes.add(email_hash(email))
+
+
+def discard(email):
+    with _lock:
+        _hashes.discard(email_hash(email))
+
+
+def _ensure_fresh(conn):
+    if _refreshed_at is not None and time.monotonic() - _refreshed_at < REFRESH_SECONDS:
+        return
+    # Only one session refreshes; the rest keep using the current index if there is one
+    if not _refresh_lock.acquire(blocking=_refreshed_at is None):
+        return _check_staleness()
+    try:
+        if _refreshed_at is not None and time.monotonic() - _refreshed_at < REFRESH_SECONDS:
+            return
+        refresh(conn)
+    except Exception as e:
+        print(f"❌ DEDUP INDEX REFRESH FAILED: {e}")
+        _check_staleness(e)
+    finally:
+        _refresh_lock.release()
+
+
+def refresh(conn):
+    # DELTA REFRESH: read the Email column starting after the last row we've seen
+    global _rows_indexed, _refreshed_at
+    first_row = _rows_indexed + 2  # +1 for the header, +1 to skip the last indexed row
+    with metrics.span("sheets.read_emails"):
+        ws = sheets_io.get_worksheet(conn)
+        values = sheets_io.get_values(ws, f"{EMAIL_COLUMN}{first_row}:{EMAIL_COLUMN}")
+    new_hashes = [email_hash(row[0]) for row in values if row and str(row[0]).strip()]
+    with _lock:
+        _hashes.update(new_hashes)
+        _rows_indexed += len(values)
+        _refreshed_at = time.monotonic()
+    return len(values)
+
+
+def _check_staleness(error=None):
+    with _lock:
+        refreshed_at = _refreshed_at
+    if refreshed_at is None:
+        raise IndexUnavailable(f"Email index could not be loaded: {error}")
+    if time.monotonic() - refreshed_at > MAX_STALE_SECONDS:
+        raise IndexUnavailable(f"Email index is stale (last refresh {int(time.monotonic() - refreshed_at)}s ago)")
@@ -0,0 +1,279 @@
+import argparse
+import csv
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+import district_resolver
+
+# --- DISTRICT / REPRESENTATIVE INDEX ---
+# In-memory index for checking what people type in step 1, with no network:
+#   normalize_district("ny14" / "NY-014" / "New York 14" / "14th district of NY") -> "NY-14"
+#   suggest_reps("ocasio cor", "NY-14") -> [("Alexandria Ocasio-Cortez", "NY-14", 0.93), ...]
+#
+# data/districts.csv (bundled): the 435 voting seats from the 2020 apportionment
+# plus the six non-voting delegates, one row per seat. At-large seats are "XX-AL".
+# data/representatives.csv (bundled, shared with district_resolver): "district,rep_name"
+# for every filled seat. Members change between elections and in special
+# elections, so refresh it from the public congress-legislators list with
+#   python district_index.py --refresh
+# Seats missing from it (vacant, or not yet refreshed) fall back to the typed name.
+DISTRICTS_PATH = os.path.join("data", "districts.csv")
+REPS_PATH = district_resolver.REPS_PATH
+LEGISLATORS_URL = "https://theunitedstates.io/congress-legislators/legislators-current.csv"
+SUGGESTIONS = 5
+MIN_SCORE = 0.5             # weaker rep-name matches aren't offered
+CONFLICT_SCORE = 0.8        # whole-name similarity to another seat's member that means a wrong district
+MAX_PREFIX = 12             # longest word prefix kept in the prefix table
+
+_FILLER = {"DISTRICT", "DIST", "CONGRESSIONAL", "CD", "OF", "THE", "S", "NO", "NUMBER"}
+_ORDINALS = {"ST", "ND", "RD", "TH"}
+_TITLES = {"rep", "representative", "congressman", "congresswoman", "mr", "mrs", "ms", "dr", "hon"}
+
+_default = None
+_default_lock = threading.Lock()
+
+
+class DistrictIndex:
+    def __init__(self, districts, reps=None):
+        # districts: dicts with district, state, state_name, number ("AL" for at-large seats)
+        self.districts = {}     # code -> row
+        self.reps = {}          # code -> rep name
+        self._variants = {}     # compact spelling ("NY14", "NEWYORK014", "AKATLARGE") -> code
+        self._entries = []      # (rep name, code, normalized name, trigram count)
+        self._prefixes = {}     # word prefix -> {entry ids}: a flattened trie for as-you-type
+        self._grams = {}        # trigram -> {entry ids}
+        for row in districts:
+            self._add_district(row)
+        for code, name in (reps or {}).items():
+            code = self.normalize_district(code)
+            if code and name and name.strip().lower() != "vacant":
+                self._add_rep(code, " ".join(name.split()))
+
+    @classmethod
+    def from_files(cls, districts_path=DISTRICTS_PATH, reps_path=REPS_PATH):
+        with open(districts_path, newline="", encoding="utf-8") as f:
+            districts = list(csv.DictReader(f))
+        reps = {}
+        if reps_path and os.path.exists(reps_path):
+            with open(reps_path, newline="", encoding="utf-8") as f:
+                reps = {row["district"]: row["rep_name"] for row in csv.DictReader(f) if row.get("rep_name")}
+        return cls(districts, reps)
+
+    def normalize_district(self, raw):
+        # Canonical code ("NY-14", "AK-AL") or None if it isn't a real seat
+        text = str(raw or "").upper()
+        code = self._variants.get(_compact(text))
+        if code is None:
+            code = self._variants.get(_prose_key(text))
+        return code
+
+    def rep_for(self, code):
+        return self.reps.get(code)
+
+    def suggest_reps(self, text, district=None, limit=SUGGESTIONS):
+        # Best (rep name, code, score) matches for a partly typed name, reps of `district` first
+        query = _normalize_name(text)
+        if len(query) < 2 or not self._entries:
+            return []
+        words = query.split()
+        # Names with a word starting with every typed word (cheap, and what as-you-type wants)
+        prefixed = None
+        for word in words:
+            hits = self._prefixes.get(word[:MAX_PREFIX], set())
+            prefixed = hits if prefixed is None else prefixed & hits
+        # Trigram overlap catches typos and misspellings
+        grams = _trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+
+        scored = []
+        for entry_id in set(shared) | prefixed:
+            name, code, _, gram_count = self._entries[entry_id]
+            score = 2 * shared[entry_id] / (len(grams) + gram_count)
+            if entry_id in prefixed:
+                score = max(score, 0.6 + 0.4 * score)
+            if district and code == district:
+                score += 0.2
+            if score >= MIN_SCORE:
+                scored.append((name, code, round(min(score, 1.0), 2)))
+        scored.sort(key=lambda match: (-match[2], match[0]))
+        return scored[:limit]
+
+    def match_rep(self, text, district=None):
+        # The single best match, or None
+        matches = self.suggest_reps(text, district, limit=1)
+        return matches[0] if matches else None
+
+    def conflicting_rep(self, district, rep_name):
+        # (name, code) of another seat's member if rep_name clearly names them, else None.
+        # Scored on the whole name: a shared first name ("Mike") isn't a conflict.
+        code = self.normalize_district(district)
+        match = self.match_rep(rep_name, code)
+        if code in self.reps and match and match[1] != code and _similarity(rep_name, match[0]) >= CONFLICT_SCORE:
+            return match[0], match[1]
+        return None
+
+    def canonical(self, district, rep_name):
+        # (code, rep name) as stored with a pledge: the seat's current member when we
+        # know it, else the closest known name, else the typed name tidied up
+        code = self.normalize_district(district)
+        if code is None:
+            return None, None
+        if code in self.reps:
+            return code, self.reps[code]
+        match = self.match_rep(rep_name, code)
+        if match and match[1] == code:
+            return code, match[0]
+        return code, " ".join(str(rep_name or "").split())
+
+    def stats(self):
+        return {"districts": len(self.districts), "voting": sum(1 for row in self.districts.values()
+                                                                 if row.get("voting", "1") == "1"),
+                "reps": len(self.reps)}
+
+    def __len__(self):
+        return len(self.districts)
+
+    def _add_district(self, row):
+        code, state = row["district"], row["state"]
+        self.districts[code] = row
+        states = {state, _compact(row["state_name"].upper()), _compact(row["state_name"].upper().replace("U.S. ", ""))}
+        if row["number"] == "AL":
+            # Census and Geocodio number at-large seats 0/00 and delegates 98 (e.g. "DC-98")
+            numbers = {"", "AL", "ATLARGE", "0", "00", "1", "01", "98"}
+        else:
+            n = int(row["number"])
+            numbers = {str(n), f"{n:02d}", f"{n:03d}"}
+        for spelling in states:
+            for number in numbers:
+                self._variants.setdefault(spelling + number, code)
+
+    def _add_rep(self, code, name):
+        self.reps[code] = name
+        entry_id = len(self._entries)
+        normalized = _normalize_name(name)
+        grams = _trigrams(normalized)
+        self._entries.append((name, code, normalized, len(grams)))
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(entry_id)
+        for word in normalized.split():
+            for end in range(1, min(len(word), MAX_PREFIX) + 1):
+                self._prefixes.setdefault(word[:end], set()).add(entry_id)
+
+
+def _compact(text):
+    return re.sub(r"[^A-Z0-9]", "", text)
+
+
+def _prose_key(text):
+    # "14TH DISTRICT OF NEW YORK" / "NEW YORK'S 14TH" -> "NEWYORK14"; "ALASKA AT LARGE" -> "ALASKAAL"
+    letters, digits, at_large, previous = [], [], False, ""
+    for token in re.findall(r"[A-Z]+|\d+", text):
+        if token.isdigit():
+            digits.append(str(int(token)))
+        elif token in _ORDINALS and previous.isdigit():
+            pass
+        elif token in ("AT", "LARGE"):
+            at_large = True
+        elif token not in _FILLER:
+            letters.append(token)
+        previous = token
+    return "".join(letters) + ("AL" if at_large else "".join(digits))
+
+
+def _normalize_name(text):
+    # "Rep. Alexandria Ocasio-Cortez" -> "alexandria ocasio cortez" (accents and punctuation dropped)
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode().lower()
+    words = re.sub(r"[^a-z0-9\s]", " ", text.replace("'", "")).split()
+    return " ".join(word for word in words if word not in _TITLES)
+
+
+def _similarity(a, b):
+    # Dice coefficient of the two names' trigrams
+    grams_a, grams_b = _trigrams(_normalize_name(a)), _trigrams(_normalize_name(b))
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def _trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def get_index():
+    # Shared index loaded once per process
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = DistrictIndex.from_files()
+        return _default
+
+
+def normalize_district(raw):
+    return get_index().normalize_district(raw)
+
+
+def rep_for(code):
+    return get_index().rep_for(code)
+
+
+def suggest_reps(text, district=None, limit=SUGGESTIONS):
+    return get_index().suggest_reps(text, district, limit)
+
+
+def conflicting_rep(district, rep_name):
+    return get_index().conflicting_rep(district, rep_name)
+
+
+def canonical(district, rep_name):
+    return get_index().canonical(district, rep_name)
+
+
+def refresh_reps(url=LEGISLATORS_URL, path=REPS_PATH):
+    # Rewrites data/representatives.csv from the public congress-legislators list
+    import io
+    import requests
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    index = DistrictIndex.from_files(reps_path=None)
+    reps = {}
+    for row in csv.DictReader(io.StringIO(response.text)):
+        if row.get("type") != "rep":
+            continue
+        # At-large seats and delegates are district 0 in this list
+        number = row.get("district") or "0"
+        code = index.normalize_district(f"{row['state']}-{'AL' if number == '0' else number}")
+        name = row.get("full_name") or f"{row.get('first_name', '')} {row.get('last_name', '')}"
+        if code:
+            reps[code] = " ".join(name.split())
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["district", "rep_name"])
+        for code in index.districts:
+            if code in reps:
+                writer.writerow([code, reps[code]])
+    os.replace(tmp, path)
+    return len(reps), len(index) - len(reps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="District/representative index.")
+    parser.add_argument("--refresh", action="store_true", help=f"download current House members into {REPS_PATH}")
+    parser.add_argument("--url", default=LEGISLATORS_URL)
+    parser.add_argument("lookup", nargs="*", help="district codes or rep names to try")
+    args = parser.parse_args()
+
+    if args.refresh:
+        found, missing = refresh_reps(args.url)
+        print(f"✅ {found} representatives written to {REPS_PATH} ({missing} seats vacant or unlisted)")
+    index = get_index()
+    print(f"{index.stats()}")
+    for text in args.lookup:
+        print(f"{text!r}: district {index.normalize_district(text)}, reps {index.suggest_reps(text)}")
+
+
+if __name__ == "__main__":
+    main()
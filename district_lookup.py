@@ -0,0 +1,260 @@
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+import admission
+import metrics
+import resilience
+
+# --- GEOCODIO DISTRICT LOOKUP WITH A PERSISTENT CACHE ---
+# Every resolved (district, rep_name) is kept in an in-memory LRU and in a small
+# SQLite file so it survives restarts. Entries are stored under the normalized
+# address and, when we know them, the ZIP+4 and the rounded lat/lon.
+GEOCODIO_URL = "https://api.geocod.io/v1.7/geocode"
+CACHE_PATH = "geocode_cache.sqlite3"
+CACHE_TTL = 30 * 24 * 3600   # reps change, districts get redrawn: re-check monthly
+MEMORY_ENTRIES = 10000
+BATCH_SIZE = 1000            # Geocodio's batch limit per request
+BATCH_TIMEOUT = 300          # a full batch can take minutes to geocode
+MAX_DEFERRED = 5000          # lookups waiting for Geocodio budget
+
+_memory = OrderedDict()      # key -> (district, rep_name, stored_at)
+_lock = threading.Lock()
+_db = None
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "api_calls": 0, "deferred": 0}
+_deferred = OrderedDict()    # address -> (api_key, lat, lon, zip4) waiting for budget
+_deferred_thread = None
+
+_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "boulevard": "blvd", "drive": "dr",
+    "lane": "ln", "court": "ct", "place": "pl", "apartment": "apt", "suite": "ste",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+}
+
+
+def normalize_address(address):
+    words = re.sub(r"[^\w\s-]", " ", str(address).lower()).split()
+    return " ".join(_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def cache_keys(address=None, lat=None, lon=None, zip4=None):
+    keys = []
+    if zip4 is None and address:
+        match = re.search(r"\b(\d{5})-(\d{4})\b", str(address))
+        if match:
+            zip4 = f"{match.group(1)}-{match.group(2)}"
+    if zip4:
+        keys.append(f"zip4:{zip4}")
+    if lat is not None and lon is not None:
+        keys.append(f"ll:{float(lat):.5f},{float(lon):.5f}")
+    if address:
+        keys.append(f"addr:{normalize_address(address)}")
+    return keys
+
+
+def get_district(address, api_key, lat=None, lon=None, zip4=None):
+    if not address: return None, None
+    keys = cache_keys(address, lat, lon, zip4)
+    cached = _cache_get(keys)
+    if cached:
+        return cached
+    if not admission.try_acquire("geocodio"):
+        # Over budget: look it up in the background when a token frees up (see is_deferred)
+        _defer(address, api_key, lat, lon, zip4)
+        return None, None
+    return _lookup(address, api_key, keys)
+
+
+def is_deferred(address):
+    # True while a lookup for this address waits for Geocodio budget; it lands in the cache
+    with _lock:
+        return address in _deferred
+
+
+def _lookup(address, api_key, keys):
+    params = {"q": address, "fields": "cd", "api_key": api_key}
+    try:
+        with metrics.span("geocodio.request"):
+            response = resilience.call("geocodio", _request, "GET", params=params)
+        if response.status_code == 200:
+            result = parse_result(response.json())
+            if result:
+                _cache_put(keys + _result_keys(response.json()), result)
+                return result
+    except Exception as e:
+        metrics.count_error("get_district")
+        print(f"Geocodio lookup failed: {e}")
+    return None, None
+
+
+def resolve_many(addresses, api_key):
+    # BATCH MODE: cached addresses are answered locally, the rest go to
+    # Geocodio's batch endpoint. Each address costs a token from the shared
+    # "geocodio" budget, so a big backfill waits for it instead of spending
+    # days of quota at once (chunks no bigger than the budget's burst).
+    results = {}
+    pending = []
+    for address in dict.fromkeys(a for a in addresses if a):
+        cached = _cache_get(cache_keys(address))
+        if cached:
+            results[address] = cached
+        else:
+            pending.append(address)
+
+    size = min(BATCH_SIZE, int(admission.bucket("geocodio").burst))
+    for start in range(0, len(pending), size):
+        chunk = pending[start:start + size]
+        admission.acquire("geocodio", len(chunk))
+        with metrics.span("geocodio.batch"):
+            response = resilience.call("geocodio", _request, "POST", params={"fields": "cd", "api_key": api_key},
+                                       json=chunk, timeout=BATCH_TIMEOUT)
+        response.raise_for_status()
+        for address, item in zip(chunk, response.json().get("results", [])):
+            data = item.get("response", {})
+            result = parse_result(data)
+            results[address] = result or (None, None)
+            if result:
+                _cache_put(cache_keys(address) + _result_keys(data), result)
+    return results
+
+
+def _request(method, timeout=None, **kwargs):
+    import requests     # imported on first lookup, not at app start
+    _count("api_calls")
+    response = requests.request(method, GEOCODIO_URL, timeout=timeout or resilience.timeout("geocodio"), **kwargs)
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()   # transient: retried, and counts toward the breaker
+    return response
+
+
+def parse_result(data):
+    # Geocodio response -> ("NY-14", "First Last"), or None if it has no district
+    results = data.get('results', [])
+    if not results:
+        return None
+    first = results[0]
+    if 'congressional_districts' not in first.get('fields', {}):
+        return None
+    dist_data = first['fields']['congressional_districts'][0]
+    state = first['address_components']['state']
+    dist_num = dist_data['district_number']
+    rep_name = "Vacant"
+    for leg in dist_data.get('current_legislators', []):
+        if leg['type'] == 'representative':
+            rep = leg['bio']
+            rep_name = f"{rep['first_name']} {rep['last_name']}"
+            break
+    return f"{state}-{dist_num}", rep_name
+
+
+def stats():
+    with _lock:
+        return dict(_stats, memory_entries=len(_memory), waiting=len(_deferred))
+
+
+def _defer(address, api_key, lat, lon, zip4):
+    global _deferred_thread
+    with _lock:
+        if address not in _deferred and len(_deferred) < MAX_DEFERRED:
+            _deferred[address] = (api_key, lat, lon, zip4)
+            _stats["deferred"] += 1
+        if _deferred_thread is None:
+            _deferred_thread = threading.Thread(target=_drain_deferred, name="geocodio-deferred", daemon=True)
+            _deferred_thread.start()
+
+
+def _drain_deferred():
+    # Oldest first, one lookup per Geocodio token; results go to the cache
+    global _deferred_thread
+    while True:
+        with _lock:
+            if not _deferred:
+                _deferred_thread = None
+                return
+            address, (api_key, lat, lon, zip4) = next(iter(_deferred.items()))
+        admission.acquire("geocodio")
+        try:
+            keys = cache_keys(address, lat, lon, zip4)
+            if not _cache_get(keys):
+                _lookup(address, api_key, keys)
+        finally:
+            with _lock:
+                _deferred.pop(address, None)
+
+
+def _result_keys(data):
+    # Extra keys from the geocoded result so nearby lookups can hit the cache
+    results = data.get('results', [])
+    if not results:
+        return []
+    location = results[0].get('location', {})
+    return cache_keys(lat=location.get('lat'), lon=location.get('lng'))
+
+
+def _cache_get(keys):
+    now = time.time()
+    with _lock:
+        for key in keys:
+            entry = _memory.get(key)
+            if entry and now - entry[2] < CACHE_TTL:
+                _memory.move_to_end(key)
+                _stats["memory_hits"] += 1
+                return entry[0], entry[1]
+
+        db = _connect()
+        for key in keys:
+            row = db.execute("SELECT district, rep_name, stored_at FROM geocode WHERE key = ?", (key,)).fetchone()
+            if row and now - row[2] < CACHE_TTL:
+                _remember(key, row)
+                _stats["disk_hits"] += 1
+                return row[0], row[1]
+        _stats["misses"] += 1
+    return None
+
+
+def _cache_put(keys, result):
+    entry = (result[0], result[1], time.time())
+    with _lock:
+        db = _connect()
+        with db:
+            db.executemany("INSERT OR REPLACE INTO geocode (key, district, rep_name, stored_at) VALUES (?, ?, ?, ?)",
+                           [(key,) + entry for key in keys])
+        for key in keys:
+            _remember(key, entry)
+
+
+def _remember(key, entry):
+    _memory[key] = tuple(entry)
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def _connect():
+    # Caller holds _lock
+    global _db
+    if _db is None:
+        _db = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _db.execute("CREATE TABLE IF NOT EXISTS geocode "
+                    "(key TEXT PRIMARY KEY, district TEXT, rep_name TEXT, stored_at REAL)")
+    return _db
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+if __name__ == "__main__":
+    # Backfill: python district_lookup.py API_KEY addresses.csv out.csv
+    # (input needs an "Address" column; District and Rep columns are added)
+    import pandas as pd
+    api_key, in_path, out_path = sys.argv[1:4]
+    df = pd.read_csv(in_path)
+    resolved = resolve_many(df["Address"].dropna().astype(str).tolist(), api_key)
+    df["District"] = df["Address"].map(lambda a: resolved.get(a, (None, None))[0])
+    df["Rep"] = df["Address"].map(lambda a: resolved.get(a, (None, None))[1])
+    df.to_csv(out_path, index=False)
+    print(f"Resolved {df['District'].notna().sum()} of {len(df)} addresses. {stats()}")
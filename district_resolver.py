@@ -0,0 +1,287 @@
+import argparse
+import csv
+import io
+import json
+import os
+import struct
+import threading
+import zipfile
+import numpy as np
+
+# --- OFFLINE CONGRESSIONAL DISTRICT RESOLVER ---
+# Answers lat/lon -> ("NY-14", rep_name) from local files, no network.
+#
+# data/cd_boundaries.geojson: district polygons, simplified from the Census
+# cartographic boundary file (a few MB instead of ~60) with
+#   python district_resolver.py --build
+# (the "Build District Boundaries" workflow runs this and commits the result).
+# Any other GeoJSON works too (e.g. ogr2ogr or mapshaper output): features need
+# either a "district" property ("NY-14") or the Census STATEFP + CD119FP (or
+# CD118FP...) properties. Census "ZZ" features (water, undefined) are skipped.
+# data/representatives.csv (bundled, shared with district_index): "district,rep_name" rows.
+BOUNDARIES_PATH = os.path.join("data", "cd_boundaries.geojson")
+REPS_PATH = os.path.join("data", "representatives.csv")
+BOUNDARIES_URL = "https://www2.census.gov/geo/tiger/GENZ2024/shp/cb_2024_us_cd119_500k.zip"
+CELL_DEGREES = 0.25     # grid cell size for the spatial index
+TOLERANCE = 0.0005      # simplification tolerance in degrees (~50 m)
+PRECISION = 4           # decimals kept in the built GeoJSON (~10 m)
+
+STATE_FIPS = {
+    "01": "AL", "02": "AK", "04": "AZ", "05": "AR", "06": "CA", "08": "CO", "09": "CT",
+    "10": "DE", "11": "DC", "12": "FL", "13": "GA", "15": "HI", "16": "ID", "17": "IL",
+    "18": "IN", "19": "IA", "20": "KS", "21": "KY", "22": "LA", "23": "ME", "24": "MD",
+    "25": "MA", "26": "MI", "27": "MN", "28": "MS", "29": "MO", "30": "MT", "31": "NE",
+    "32": "NV", "33": "NH", "34": "NJ", "35": "NM", "36": "NY", "37": "NC", "38": "ND",
+    "39": "OH", "40": "OK", "41": "OR", "42": "PA", "44": "RI", "45": "SC", "46": "SD",
+    "47": "TN", "48": "TX", "49": "UT", "50": "VT", "51": "VA", "53": "WA", "54": "WV",
+    "55": "WI", "56": "WY", "60": "AS", "66": "GU", "69": "MP", "72": "PR", "78": "VI",
+}
+
+_default = None
+_default_lock = threading.Lock()
+
+
+class DistrictResolver:
+    def __init__(self, features, reps=None, cell_degrees=CELL_DEGREES):
+        # features: iterable of (district_code, geojson_geometry)
+        self.cell = cell_degrees
+        self.reps = dict(reps or {})
+        self.codes = []
+        self.parts = []         # (district index, bbox, [ring arrays]) per polygon part
+        self.grid = {}          # (cell x, cell y) -> [part indexes]
+        for code, geometry in features:
+            self._add(code, geometry)
+
+    @classmethod
+    def from_files(cls, boundaries_path=BOUNDARIES_PATH, reps_path=REPS_PATH):
+        with open(boundaries_path, encoding="utf-8") as f:
+            collection = json.load(f)
+        features = [(code, feat["geometry"]) for feat in collection["features"]
+                    if feat.get("geometry") and (code := _district_code(feat["properties"]))]
+        reps = {}
+        if reps_path and os.path.exists(reps_path):
+            with open(reps_path, newline="", encoding="utf-8") as f:
+                reps = {row["district"]: row["rep_name"] for row in csv.DictReader(f) if row.get("rep_name")}
+        return cls(features, reps)
+
+    def lookup(self, lat, lon):
+        # Returns (district, rep_name), or (None, None) for points outside every district
+        code = self.district_at(lat, lon)
+        if code is None:
+            return None, None
+        return code, self.reps.get(code)
+
+    def district_at(self, lat, lon):
+        for part_index in self.grid.get(self._cell(lon, lat), ()):
+            district_index, (min_x, min_y, max_x, max_y), rings = self.parts[part_index]
+            if min_x <= lon <= max_x and min_y <= lat <= max_y and _in_polygon(lon, lat, rings):
+                return self.codes[district_index]
+        return None
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _add(self, code, geometry):
+        district_index = len(self.codes)
+        self.codes.append(code)
+        polygons = geometry["coordinates"]
+        if geometry["type"] == "Polygon":
+            polygons = [polygons]
+        for polygon in polygons:
+            rings = [np.asarray(ring, dtype=float)[:, :2] for ring in polygon]
+            outer = rings[0]
+            bbox = (outer[:, 0].min(), outer[:, 1].min(), outer[:, 0].max(), outer[:, 1].max())
+            part_index = len(self.parts)
+            self.parts.append((district_index, bbox, rings))
+            x0, y0 = self._cell(bbox[0], bbox[1])
+            x1, y1 = self._cell(bbox[2], bbox[3])
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    self.grid.setdefault((x, y), []).append(part_index)
+
+    def _cell(self, lon, lat):
+        return int(lon // self.cell), int(lat // self.cell)
+
+
+def _in_polygon(x, y, rings):
+    # Even-odd ray casting over the outer ring and its holes
+    inside = False
+    for ring in rings:
+        xs, ys = ring[:, 0], ring[:, 1]
+        xs2, ys2 = np.roll(xs, -1), np.roll(ys, -1)
+        straddles = (ys > y) != (ys2 > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cross_x = xs + (y - ys) * (xs2 - xs) / (ys2 - ys)
+        if np.count_nonzero(straddles & (x < cross_x)) % 2:
+            inside = not inside
+    return inside
+
+
+def _district_code(props):
+    # "NY-14", or None for features that aren't a seat
+    if props.get("district"):
+        return props["district"]
+    state = STATE_FIPS.get(props.get("STATEFP"))
+    number = next((value for key, value in props.items() if key.startswith("CD") and key.endswith("FP")), "")
+    # Census uses 00 for at-large seats, 98 for non-voting delegates and ZZ for water/undefined
+    if state is None or not number.isdigit():
+        return None
+    return f"{state}-{'AL' if number in ('00', '98') else int(number)}"
+
+
+# --- BUILDING data/cd_boundaries.geojson ---
+
+def build_boundaries(url=BOUNDARIES_URL, path=BOUNDARIES_PATH, tolerance=TOLERANCE):
+    # Downloads the Census shapefile zip (or reads a local one) and writes simplified GeoJSON
+    if os.path.exists(url):
+        with open(url, "rb") as f:
+            archive = f.read()
+    else:
+        import requests
+        response = requests.get(url, timeout=120)
+        response.raise_for_status()
+        archive = response.content
+    with zipfile.ZipFile(io.BytesIO(archive)) as z:
+        names = {os.path.splitext(name)[1].lower(): name for name in z.namelist()}
+        records = _read_dbf(z.read(names[".dbf"]))
+        shapes = _read_shp(z.read(names[".shp"]))
+    features, points = [], 0
+    for props, rings in zip(records, shapes):
+        code = _district_code(props)
+        rings = [_round(_simplify(ring, tolerance)) for ring in rings]
+        polygons = _group_rings([ring for ring in rings if len(ring) >= 4])
+        if code is None or not polygons:
+            continue
+        points += sum(len(ring) for polygon in polygons for ring in polygon)
+        features.append({"type": "Feature", "properties": {"district": code},
+                         "geometry": {"type": "MultiPolygon",
+                                      "coordinates": [[ring.tolist() for ring in polygon] for polygon in polygons]}})
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    return len(features), points
+
+
+def _read_dbf(data):
+    # dBase III records as dicts of stripped strings
+    count, header_len, record_len = struct.unpack("<IHH", data[4:12])
+    fields, offset = [], 32
+    while data[offset] != 0x0D:
+        name = data[offset:offset + 11].split(b"\0")[0].decode("ascii")
+        fields.append((name, data[offset + 16]))
+        offset += 32
+    records = []
+    for i in range(count):
+        start = header_len + i * record_len + 1     # first byte is the deletion flag
+        record = {}
+        for name, length in fields:
+            record[name] = data[start:start + length].decode("latin-1").strip()
+            start += length
+        records.append(record)
+    return records
+
+
+def _read_shp(data):
+    # Polygon records as lists of (n, 2) ring arrays; null shapes are empty lists
+    shapes, offset = [], 100
+    while offset < len(data):
+        _, words = struct.unpack(">ii", data[offset:offset + 8])
+        content = data[offset + 8:offset + 8 + 2 * words]
+        offset += 8 + 2 * words
+        if struct.unpack("<i", content[:4])[0] not in (5, 15, 25):
+            shapes.append([])
+            continue
+        num_parts, num_points = struct.unpack("<ii", content[36:44])
+        starts = list(struct.unpack(f"<{num_parts}i", content[44:44 + 4 * num_parts])) + [num_points]
+        points = np.frombuffer(content, dtype="<f8", count=2 * num_points,
+                               offset=44 + 4 * num_parts).reshape(-1, 2)
+        shapes.append([points[a:b] for a, b in zip(starts, starts[1:])])
+    return shapes
+
+
+def _simplify(ring, tolerance):
+    # Douglas-Peucker; the ring's first and last points are kept
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(ring) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = ring[end] - ring[start]
+        offsets = ring[start + 1:end] - ring[start]
+        length = np.hypot(*segment)
+        if length:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        else:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack += [(start, split), (split, end)]
+    return ring[keep]
+
+
+def _round(ring):
+    # Rounded, with the repeated points that rounding leaves behind dropped
+    ring = np.round(ring, PRECISION)
+    changed = np.any(ring[1:] != ring[:-1], axis=1)
+    return ring[np.concatenate(([True], changed))]
+
+
+def _group_rings(rings):
+    # Shapefile outer rings run clockwise and holes counter-clockwise; each hole
+    # goes with the smallest outer ring containing it
+    outers, holes = [], []
+    for ring in rings:
+        (outers if _signed_area(ring) < 0 else holes).append(ring)
+    polygons = [[outer] for outer in outers]
+    for hole in holes:
+        x, y = hole[0]
+        containing = [i for i, outer in enumerate(outers) if _in_polygon(x, y, [outer])]
+        if containing:
+            polygons[min(containing, key=lambda i: -_signed_area(outers[i]))].append(hole)
+    return polygons
+
+
+def _signed_area(ring):
+    xs, ys = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(xs, np.roll(ys, -1)) - np.dot(ys, np.roll(xs, -1)))
+
+
+def get_resolver():
+    # Shared resolver loaded once per process; None if the boundary file isn't installed
+    global _default
+    with _default_lock:
+        if _default is None and os.path.exists(BOUNDARIES_PATH):
+            _default = DistrictResolver.from_files()
+        return _default
+
+
+def get_district(lat, lon):
+    resolver = get_resolver()
+    if resolver is None or lat is None or lon is None:
+        return None, None
+    return resolver.lookup(float(lat), float(lon))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline congressional district resolver.")
+    parser.add_argument("--build", action="store_true", help=f"build {BOUNDARIES_PATH} from the Census shapefile")
+    parser.add_argument("--url", default=BOUNDARIES_URL, help="shapefile zip URL or local path")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("point", nargs="*", type=float, help="LAT LON to look up")
+    args = parser.parse_args()
+
+    if args.build:
+        features, points = build_boundaries(args.url, tolerance=args.tolerance)
+        size = os.path.getsize(BOUNDARIES_PATH) / 1e6
+        print(f"✅ {features} districts ({points} points, {size:.1f} MB) written to {BOUNDARIES_PATH}")
+    if len(args.point) == 2:
+        print(get_district(*args.point))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+import metrics
+import resilience
+
+# --- OUTGOING EMAIL QUEUE ---
+# send() queues a message and returns an id right away. One worker thread keeps
+# a logged-in SMTP connection open, reconnects when it drops, paces messages to
+# the provider's limits and records each message's status.
+# For local testing point configure() at a stand-in server, e.g.
+#   python -m aiosmtpd -n -l localhost:8025   ->  configure("localhost", 8025, use_ssl=False)
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 465
+PER_MINUTE_LIMIT = 20
+DAILY_LIMIT = 450           # Gmail allows ~500/day; keep some headroom
+IDLE_DISCONNECT = 120       # close the connection after this many idle seconds
+MAX_ATTEMPTS = 3
+MAX_TRACKED = 10000         # statuses kept for sessions to poll
+
+_config = {"host": SMTP_HOST, "port": SMTP_PORT, "username": None, "password": None,
+           "sender": None, "use_ssl": True}
+_queue = queue.Queue()
+_status = {}                # message id -> "queued" | "sent" | "failed: ..."
+_sent_times = deque()       # send times within the last 24h, for the quota
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_thread = None
+
+
+def configure(host=SMTP_HOST, port=SMTP_PORT, username=None, password=None, sender=None, use_ssl=True):
+    with _lock:
+        _config.update(host=host, port=port, username=username, password=password,
+                       sender=sender or username, use_ssl=use_ssl)
+
+
+def send(to_email, subject, body):
+    # Returns a message id, or None if today's quota is already used up
+    with _lock:
+        _trim_sent_times(time.time())
+        if len(_sent_times) + _pending() >= DAILY_LIMIT:
+            return None
+        msg_id = next(_ids)
+        _status[msg_id] = "queued"
+        # Forget the oldest finished messages
+        for old_id in list(itertools.islice(_status, max(0, len(_status) - MAX_TRACKED))):
+            if _status[old_id] != "queued":
+                del _status[old_id]
+    _ensure_worker()
+    _queue.put((msg_id, to_email, subject, body))
+    return msg_id
+
+
+def status(msg_id):
+    with _lock:
+        return _status.get(msg_id)
+
+
+def stats():
+    with _lock:
+        _trim_sent_times(time.time())
+        values = list(_status.values())
+        return {"queued": values.count("queued"), "sent": values.count("sent"),
+                "failed": sum(v.startswith("failed") for v in values), "sent_last_24h": len(_sent_times)}
+
+
+def _pending():
+    # Caller holds _lock
+    return sum(1 for value in _status.values() if value == "queued")
+
+
+def _trim_sent_times(now):
+    while _sent_times and now - _sent_times[0] > 24 * 3600:
+        _sent_times.popleft()
+
+
+def _ensure_worker():
+    global _thread
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_run, name="email-sender", daemon=True)
+            _thread.start()
+
+
+@metrics.timed("smtp.connect")
+def _connect():
+    import smtplib
+    with _lock:
+        config = dict(_config)
+    if config["use_ssl"]:
+        server = smtplib.SMTP_SSL(config["host"], config["port"], timeout=resilience.timeout("smtp"))
+    else:
+        server = smtplib.SMTP(config["host"], config["port"], timeout=resilience.timeout("smtp"))
+    if config["username"]:
+        server.login(config["username"], config["password"])
+    return server, config["sender"]
+
+
+def _close(server):
+    try:
+        server.quit()
+    except Exception:
+        pass
+
+
+def _wait_for_rate_limit():
+    # At most PER_MINUTE_LIMIT messages in any 60 seconds
+    with _lock:
+        now = time.time()
+        recent = [t for t in _sent_times if now - t < 60]
+        wait = 60 - (now - recent[-PER_MINUTE_LIMIT]) if len(recent) >= PER_MINUTE_LIMIT else 0
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _run():
+    # smtplib/email are imported by the worker on first send, not at app start
+    import smtplib
+    from email.mime.text import MIMEText
+    server, sender = None, None
+    while True:
+        try:
+            msg_id, to_email, subject, body = _queue.get(timeout=IDLE_DISCONNECT)
+        except queue.Empty:
+            if server is not None:
+                _close(server)
+                server = None
+            continue
+
+        _wait_for_rate_limit()
+        result = None
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                if server is None:
+                    server, sender = resilience.call("smtp", _connect)
+                msg = MIMEText(body)
+                msg['Subject'] = subject
+                msg['From'] = f"The 80% Pledge <{sender}>"
+                msg['To'] = to_email
+                with metrics.span("smtp.send"):
+                    resilience.call("smtp", server.sendmail, sender, to_email, msg.as_string())
+                result = "sent"
+                break
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused,
+                    smtplib.SMTPDataError, smtplib.SMTPAuthenticationError) as e:
+                # The server refused this message (bad address, limit hit...): don't retry
+                result = f"failed: {e}"
+                break
+            except resilience.CircuitOpen as e:
+                # SMTP has been failing: wait for the breaker's next probe instead of hammering it
+                result = f"failed: {e}"
+                time.sleep(max(e.retry_in, 1))
+            except OSError as e:
+                # Connection dropped (SMTP errors are OSErrors too): reconnect and try again
+                if server is not None:
+                    _close(server)
+                server = None
+                result = f"failed: {e}"
+                time.sleep(resilience.backoff(attempt))
+
+        with _lock:
+            _status[msg_id] = result
+            if result == "sent":
+                _sent_times.append(time.time())
+        if result != "sent":
+            print(f"Email {msg_id} to {to_email} {result}")
@@ -0,0 +1,111 @@
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# --- HOT-PATH TIMING ---
+# `with metrics.span("sheets.append"):` times a block. Every span name keeps a
+# cumulative histogram (for the Prometheus dump), the last WINDOW durations
+# (for p50/p95/p99 in the admin panel) and an error count.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+WINDOW = 500
+
+_spans = {}
+_lock = threading.Lock()
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, seconds, failed):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        if failed:
+            self.errors += 1
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        observe(name, time.perf_counter() - start, failed)
+
+
+def timed(name):
+    # Decorator version of span()
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def observe(name, seconds, failed=False):
+    with _lock:
+        histogram = _spans.get(name)
+        if histogram is None:
+            histogram = _spans[name] = _Histogram()
+        histogram.observe(seconds, failed)
+
+
+def count_error(name):
+    # For failures that are caught and handled inside a span
+    with _lock:
+        histogram = _spans.get(name)
+        if histogram is None:
+            histogram = _spans[name] = _Histogram()
+        histogram.errors += 1
+
+
+def summary():
+    # One row per span for the admin panel (times in ms over the recent window)
+    rows = []
+    with _lock:
+        items = [(name, h.count, h.errors, sorted(h.recent)) for name, h in sorted(_spans.items())]
+    for name, count, errors, recent in items:
+        row = {"span": name, "calls": count, "errors": errors}
+        for label, q in (("p50 ms", 0.50), ("p95 ms", 0.95), ("p99 ms", 0.99)):
+            row[label] = round(recent[min(len(recent) - 1, int(len(recent) * q))] * 1000, 1) if recent else None
+        rows.append(row)
+    return rows
+
+
+def prometheus_text():
+    lines = [
+        "# HELP pledge_span_seconds Time spent in app operations and external calls.",
+        "# TYPE pledge_span_seconds histogram",
+    ]
+    errors = [
+        "# HELP pledge_span_errors_total Operations that raised or reported a failure.",
+        "# TYPE pledge_span_errors_total counter",
+    ]
+    with _lock:
+        for name, h in sorted(_spans.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS, h.buckets):
+                cumulative += n
+                lines.append(f'pledge_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'pledge_span_seconds_bucket{{span="{name}",le="+Inf"}} {h.count}')
+            lines.append(f'pledge_span_seconds_sum{{span="{name}"}} {h.total:.6f}')
+            lines.append(f'pledge_span_seconds_count{{span="{name}"}} {h.count}')
+            errors.append(f'pledge_span_errors_total{{span="{name}"}} {h.errors}')
+    return "\n".join(lines + errors) + "\n"
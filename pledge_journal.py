@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+import metrics
+
+# --- LOCAL WRITE-AHEAD JOURNAL ---
+# Every pledge is appended here (and fsync'd) before we tell the signer it's saved.
+# The sheet flusher copies entries to Google Sheets later and records how far it
+# got per target in the checkpoint file, so nothing is lost if Sheets is down.
+JOURNAL_PATH = "pledge_journal.jsonl"
+CHECKPOINT_PATH = "pledge_journal.checkpoint.json"
+
+_lock = threading.Lock()
+_next_seq = None
+
+
+def append_batch(rows):
+    # One write + one fsync for the whole batch. Returns the sequence numbers assigned.
+    global _next_seq
+    with _lock:
+        if _next_seq is None:
+            _next_seq = _recover()
+        seqs = list(range(_next_seq, _next_seq + len(rows)))
+        lines = "".join(json.dumps({"seq": seq, "row": row}) + "\n" for seq, row in zip(seqs, rows))
+        with metrics.span("journal.append"), open(JOURNAL_PATH, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        _next_seq += len(rows)
+        return seqs
+
+
+def read_after(offset, limit):
+    # Returns up to `limit` entries starting at byte `offset`, plus the offset just past them.
+    # Each entry also carries the byte offset just past itself.
+    entries = []
+    if not os.path.exists(JOURNAL_PATH):
+        return entries, offset
+    with open(JOURNAL_PATH, "rb") as f:
+        f.seek(offset)
+        while len(entries) < limit:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                break  # end of file (or a write still in progress)
+            offset = f.tell()
+            entries.append(dict(json.loads(line), offset=offset))
+    return entries, offset
+
+
+def load_checkpoints():
+    if not os.path.exists(CHECKPOINT_PATH):
+        return {}
+    with open(CHECKPOINT_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(target, seq, offset):
+    # Atomic replace so a crash can never leave a half-written checkpoint
+    with _lock:
+        checkpoints = load_checkpoints()
+        checkpoints[target] = {"seq": seq, "offset": offset}
+        tmp_path = CHECKPOINT_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoints, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CHECKPOINT_PATH)
+
+
+def _recover():
+    # Drop a torn last line left by a crash mid-write, then find the next sequence number
+    if not os.path.exists(JOURNAL_PATH):
+        return 1
+    with open(JOURNAL_PATH, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            print(f"⚠️ JOURNAL: dropping {len(data) - end} bytes of an incomplete entry")
+            f.truncate(end)
+        last_line = data[:end].rstrip(b"\n").rsplit(b"\n", 1)[-1]
+    return json.loads(last_line)["seq"] + 1 if last_line else 1
@@ -0,0 +1,206 @@
+import glob
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pledge_store
+
+# --- COLUMNAR SNAPSHOT + PRECOMPUTED ANALYTICS ---
+# A copy of the pledge table (seq, timestamp, district, state, rep; no names or
+# emails) kept as Parquet part files under SNAPSHOT_DIR and as one in-memory
+# DataFrame with categorical District/State/Rep columns. Every REFRESH_SECONDS
+# a background job appends only the rows committed since the last refresh
+# (one new part file), then recomputes the analytics with vectorized groupbys.
+# The Analytics tab just reads analytics(): no sheet or database reads per view.
+# Parts are merged into one file once there are more than MAX_PARTS.
+SNAPSHOT_DIR = "pledge_snapshot"
+REFRESH_SECONDS = 5 * 60
+RETRY_SECONDS = 60
+PAGE_ROWS = 100000          # rows read from the store per query
+MAX_PARTS = 20
+TOP = 20
+CATEGORIES = ["district", "state", "rep"]
+
+_frame = None               # the snapshot DataFrame
+_last_seq = 0
+_analytics = None
+_refreshed_at = None
+_refreshing = False
+_attempted_at = 0.0
+_lock = threading.Lock()
+
+
+def analytics():
+    # Latest precomputed analytics (dict of DataFrames/values), or None before the first refresh
+    with _lock:
+        return _analytics
+
+
+def maybe_refresh():
+    # Starts a background refresh if the snapshot is missing or older than REFRESH_SECONDS
+    global _refreshing, _attempted_at
+    with _lock:
+        now = time.time()
+        due = _refreshed_at is None or now - _refreshed_at > REFRESH_SECONDS
+        if not due or _refreshing or now - _attempted_at < RETRY_SECONDS:
+            return False
+        _refreshing = True
+        _attempted_at = now
+    threading.Thread(target=_refresh_safely, name="pledge-snapshot", daemon=True).start()
+    return True
+
+
+def refresh():
+    # Append rows committed since the last refresh, then recompute the analytics
+    global _frame, _last_seq, _analytics, _refreshed_at
+    frame, last_seq = _frame, _last_seq
+    if frame is None:
+        frame = _load()
+        last_seq = int(frame["seq"].max()) if len(frame) else 0
+
+    store = pledge_store.get_store()
+    if not hasattr(store, "rows_after"):
+        raise RuntimeError(f"the {store.name} store can't be snapshotted (use the sqlite backend)")
+    new_parts = []
+    while True:
+        rows = store.rows_after(last_seq, PAGE_ROWS)
+        if not rows:
+            break
+        part = to_frame(rows)
+        _write_part(part)
+        new_parts.append(part)
+        last_seq = int(part["seq"].iloc[-1])
+
+    if new_parts:
+        frame = pd.concat([frame] + new_parts, ignore_index=True)
+        frame = frame.astype({column: "category" for column in CATEGORIES})
+        if len(_part_paths()) > MAX_PARTS:
+            _compact(frame)
+    computed = compute(frame)
+    with _lock:
+        _frame, _last_seq = frame, last_seq
+        _analytics = computed
+        _refreshed_at = time.time()
+    return len(frame)
+
+
+def to_frame(rows):
+    # (seq, timestamp, district, rep) tuples -> typed snapshot rows
+    df = pd.DataFrame(rows, columns=["seq", "timestamp", "district", "rep"])
+    df["seq"] = df["seq"].astype("int64")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    df["district"] = df["district"].fillna("").astype(str).str.strip().str.upper()
+    df["state"] = df["district"].str.split("-").str[0]
+    df["rep"] = df["rep"].fillna("").astype(str).str.split().str.join(" ")
+    return df.astype({column: "category" for column in CATEGORIES})
+
+
+def compute(frame, now=None):
+    # All the numbers behind the Analytics tab, in one pass of vectorized groupbys
+    now = pd.Timestamp.now() if now is None else now
+    timed = frame.dropna(subset=["timestamp"])
+    ts = timed["timestamp"]
+    day = ts.dt.floor("D")
+
+    daily = timed.groupby(day).size().rename("signups")
+    if len(daily):
+        daily = daily.reindex(pd.date_range(daily.index.min(), now.floor("D"), freq="D"), fill_value=0)
+    daily = daily.to_frame()
+    daily["total"] = daily["signups"].cumsum() + (len(frame) - len(timed))
+    daily["7_day_avg"] = daily["signups"].rolling(7, min_periods=1).mean()
+    # Week-over-week change of the 7-day average
+    weekly_change = daily["7_day_avg"] / daily["7_day_avg"].shift(7) - 1
+    daily["growth_%"] = (weekly_change.replace([np.inf, -np.inf], np.nan) * 100).round(1)
+
+    recent = timed[ts > now - pd.Timedelta(hours=48)]
+    hourly = recent.groupby(recent["timestamp"].dt.floor("h")).size().rename("signups").to_frame()
+
+    last_week = ts > now - pd.Timedelta(days=7)
+    week_before = (ts > now - pd.Timedelta(days=14)) & ~last_week
+    return {
+        "total": len(frame),
+        "last_24h": int((ts > now - pd.Timedelta(hours=24)).sum()),
+        "last_7d": int(last_week.sum()),
+        "growth_7d": _growth(int(last_week.sum()), int(week_before.sum())),
+        "daily": daily,
+        "hourly": hourly,
+        "by_state": _breakdown(frame, timed, "state", last_week, week_before),
+        "by_district": _breakdown(frame, timed, "district", last_week, week_before),
+        "rows": len(frame),
+        "computed_at": time.time(),
+    }
+
+
+def _breakdown(frame, timed, column, last_week, week_before):
+    # Totals plus this week vs last week per category (observed values only)
+    table = pd.DataFrame({
+        "signatures": frame.groupby(column, observed=True).size(),
+        "last_7d": timed[last_week].groupby(column, observed=True).size(),
+        "prior_7d": timed[week_before].groupby(column, observed=True).size(),
+    }).fillna(0).astype("int64")
+    table = table[table.index != ""]
+    growth = (table["last_7d"] - table["prior_7d"]) / table["prior_7d"].where(table["prior_7d"] > 0)
+    table["growth_%"] = (growth * 100).round(1)
+    table.index.name = column.title()
+    return table.sort_values("signatures", ascending=False).head(TOP)
+
+
+def _growth(current, previous):
+    return round((current - previous) / previous * 100, 1) if previous else None
+
+
+def _refresh_safely():
+    global _refreshing
+    try:
+        rows = refresh()
+        print(f"✅ Snapshot refreshed: {rows} rows")
+    except Exception as e:
+        print(f"❌ SNAPSHOT REFRESH FAILED: {e}")
+    finally:
+        with _lock:
+            _refreshing = False
+
+
+def _store_ready(conn):
+    # The store just imported the sheet: don't wait out RETRY_SECONDS
+    global _attempted_at
+    with _lock:
+        _attempted_at = 0.0
+    maybe_refresh()
+
+
+def _part_paths():
+    return sorted(glob.glob(os.path.join(SNAPSHOT_DIR, "*.parquet")))
+
+
+def _load():
+    paths = _part_paths()
+    if not paths:
+        return to_frame([])
+    frame = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+    # A part written just before a crash may repeat rows of a compacted file
+    frame = frame.drop_duplicates("seq").sort_values("seq", ignore_index=True)
+    return frame.astype({column: "category" for column in CATEGORIES})
+
+
+def _write_part(part):
+    # Named by the first seq it holds, so parts sort in commit order
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = os.path.join(SNAPSHOT_DIR, f"part-{int(part['seq'].iloc[0]):012d}.parquet")
+    part.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+
+
+def _compact(frame):
+    # One file for everything so far, then drop the parts it replaces
+    old = _part_paths()
+    path = os.path.join(SNAPSHOT_DIR, "part-000000000000.parquet")
+    frame.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+    for part in old:
+        if part != path:
+            os.remove(part)
+
+
+pledge_store.on_ready(_store_ready)
@@ -0,0 +1,234 @@
+import sqlite3
+import threading
+import dedup_index
+import metrics
+import pledge_journal
+import sheets_io
+
+# --- PLEDGE STORAGE BACKENDS ---
+# The primary copy of every pledge lives in a local store; the main sheet and
+# the BACKUP_URL vault are mirrors that the sheet flusher fills in the background.
+#   "sqlite":  pledges.sqlite3 in WAL mode. A UNIQUE index on the normalized email
+#              does the duplicate check, so no sheet reads on the request path.
+#   "journal": the JSONL write-ahead journal + in-memory email index built from
+#              the main sheet (the previous setup).
+# Every backend offers: ensure_ready, is_duplicate, commit, pending,
+# mark_flushed and tally_rows.
+BACKEND = "sqlite"
+SQLITE_PATH = "pledges.sqlite3"
+# Same floor as the old safety lock: a shorter read of the main sheet is treated
+# as a failed read, not as the list of everyone who signed
+BOOTSTRAP_MIN_ROWS = 50
+
+_store = None
+_store_lock = threading.Lock()
+_ready_callbacks = []       # called with the Sheets connection once the store has imported the sheet
+
+
+class StoreUnavailable(Exception):
+    pass
+
+
+def on_ready(callback):
+    # e.g. tallies/snapshot rebuilding as soon as the imported signatures are there
+    _ready_callbacks.append(callback)
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SQLiteStore(SQLITE_PATH) if BACKEND == "sqlite" else JournalStore()
+        return _store
+
+
+class JournalStore:
+    name = "journal"
+
+    def ensure_ready(self, conn):
+        pass  # the email index loads itself on first use
+
+    def is_duplicate(self, conn, email):
+        return dedup_index.contains(conn, email)
+
+    def commit(self, rows):
+        # Returns a sequence number per row, None for duplicates. Caller is the single commit writer.
+        accepted, is_new = [], []
+        for row in rows:
+            new = not dedup_index.seen(row["Email"])
+            if new:
+                dedup_index.add(row["Email"])
+                accepted.append(row)
+            is_new.append(new)
+        try:
+            seqs = iter(pledge_journal.append_batch(accepted) if accepted else [])
+        except Exception:
+            # Not committed: forget the emails so they can try again
+            for row in accepted:
+                dedup_index.discard(row["Email"])
+            raise
+        return [next(seqs) if new else None for new in is_new]
+
+    def pending(self, target, limit):
+        offset = pledge_journal.load_checkpoints().get(target, {}).get("offset", 0)
+        entries, _ = pledge_journal.read_after(offset, limit)
+        return entries
+
+    def mark_flushed(self, target, entry):
+        pledge_journal.save_checkpoint(target, entry["seq"], entry["offset"])
+
+    def tally_rows(self, conn):
+        # Sheet1 + journal entries not yet flushed to it. A row can be in both
+        # while the flusher runs, so rows are merged by email.
+        checkpoint = pledge_journal.load_checkpoints().get("main", {})
+        with metrics.span("sheets.read_tallies"):
+            values = sheets_io.get_values(sheets_io.get_worksheet(conn), "C2:E")
+        pending, _ = pledge_journal.read_after(checkpoint.get("offset", 0), float("inf"))
+
+        rows = {}
+        for value in values:
+            value = list(value) + [""] * (3 - len(value))
+            if str(value[0]).strip():
+                rows[dedup_index.normalize_email(value[0])] = {"District": value[1], "Rep": value[2]}
+        last_seq = checkpoint.get("seq", 0)
+        for entry in pending:
+            rows[dedup_index.normalize_email(entry["row"]["Email"])] = entry["row"]
+            last_seq = entry["seq"]
+        return list(rows.values()), last_seq
+
+
+class SQLiteStore:
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        db = self._db()
+        with db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS pledges (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT, name TEXT, email TEXT, email_norm TEXT NOT NULL,
+                    district TEXT, rep TEXT
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS pledges_email ON pledges (email_norm);
+                CREATE INDEX IF NOT EXISTS pledges_district ON pledges (district);
+                CREATE INDEX IF NOT EXISTS pledges_timestamp ON pledges (timestamp);
+                CREATE TABLE IF NOT EXISTS mirror_checkpoints (target TEXT PRIMARY KEY, seq INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+        self._ready = db.execute("SELECT 1 FROM meta WHERE key = 'bootstrapped'").fetchone() is not None
+
+    def _db(self):
+        # One connection per thread; WAL lets readers run while the writer commits
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            # NORMAL in WAL mode survives app crashes; only an OS crash can drop the last commits
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.isolation_level = ""   # back to implicit transactions for `with db:`
+            self._local.db = db
+        return db
+
+    def ensure_ready(self, conn):
+        # First run only: copy the existing main sheet in so the UNIQUE index knows
+        # everyone who signed before the switch. Those rows are already in both mirrors.
+        if self._ready:
+            return
+        with self._ready_lock:
+            if self._ready:
+                return
+            try:
+                with metrics.span("sheets.bootstrap_read"):
+                    values = sheets_io.get_values(sheets_io.get_worksheet(conn), "A2:E")
+            except Exception as e:
+                raise StoreUnavailable(f"Could not import existing signatures: {e}")
+            signed = sum(1 for v in values if len(v) > 2 and str(v[2]).strip())
+            if signed < BOOTSTRAP_MIN_ROWS:
+                # Empty or truncated read: importing it would disable the duplicate check for good
+                raise StoreUnavailable(f"Main sheet returned only {signed} signatures "
+                                       f"(expected at least {BOOTSTRAP_MIN_ROWS}); not importing")
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT OR IGNORE INTO pledges (timestamp, name, email, email_norm, district, rep) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(v[0], v[1], v[2], dedup_index.normalize_email(v[2]), v[3], v[4])
+                     for v in (list(v) + [""] * (5 - len(v)) for v in values) if str(v[2]).strip()])
+                last_seq = db.execute("SELECT COALESCE(MAX(seq), 0) FROM pledges").fetchone()[0]
+                db.executemany("INSERT OR REPLACE INTO mirror_checkpoints (target, seq) VALUES (?, ?)",
+                               [("main", last_seq), ("vault", last_seq)])
+                db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('bootstrapped', ?)", (str(len(values)),))
+            print(f"✅ Imported {signed} existing signatures ({len(values)} sheet rows) into {self.path}")
+            self._ready = True
+        for callback in _ready_callbacks:
+            try:
+                callback(conn)
+            except Exception as e:
+                print(f"⚠️ After-import callback failed: {e}")
+
+    def is_duplicate(self, conn, email):
+        self.ensure_ready(conn)
+        row = self._db().execute("SELECT 1 FROM pledges WHERE email_norm = ?",
+                                 (dedup_index.normalize_email(email),)).fetchone()
+        return row is not None
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def commit(self, rows):
+        # One transaction for the batch; the UNIQUE index turns duplicates into None
+        with metrics.span("sqlite.commit"):
+            return self.insert_rows(rows)
+
+    def insert_rows(self, rows):
+        # Bulk insert (commit and pledge_tool). Refused until the sheet is imported: the
+        # import moves the mirror checkpoints past every row already in the store.
+        if not self._ready:
+            raise StoreUnavailable("Signature database has not imported the existing sheet yet")
+        seqs = []
+        db = self._db()
+        with db:
+            for row in rows:
+                cur = db.execute(
+                    "INSERT OR IGNORE INTO pledges (timestamp, name, email, email_norm, district, rep) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (row["Timestamp"], row["Name"], row["Email"], dedup_index.normalize_email(row["Email"]),
+                     row["District"], row["Rep"]))
+                seqs.append(cur.lastrowid if cur.rowcount else None)
+        return seqs
+
+    def pending(self, target, limit):
+        db = self._db()
+        done = db.execute("SELECT seq FROM mirror_checkpoints WHERE target = ?", (target,)).fetchone()
+        cursor = db.execute(
+            "SELECT seq, timestamp, name, email, district, rep FROM pledges WHERE seq > ? ORDER BY seq LIMIT ?",
+            (done[0] if done else 0, limit))
+        return [{"seq": seq, "row": dict(zip(sheets_io.COLUMNS, values))} for seq, *values in cursor]
+
+    def mark_flushed(self, target, entry):
+        db = self._db()
+        with db:
+            db.execute("INSERT OR REPLACE INTO mirror_checkpoints (target, seq) VALUES (?, ?)",
+                       (target, entry["seq"]))
+
+    def tally_rows(self, conn):
+        # After a restart on a fresh disk the store is empty until it imports the sheet
+        self.ensure_ready(conn)
+        db = self._db()
+        with db:
+            last_seq = db.execute("SELECT COALESCE(MAX(seq), 0) FROM pledges").fetchone()[0]
+            rows = [{"District": d, "Rep": r} for d, r in
+                    db.execute("SELECT district, rep FROM pledges WHERE seq <= ?", (last_seq,))]
+        return rows, last_seq
+
+    def rows_after(self, seq, limit):
+        # (seq, timestamp, district, rep) in commit order, for the analytics snapshot
+        if not self._ready:
+            raise StoreUnavailable("Signature database has not imported the existing sheet yet")
+        return self._db().execute("SELECT seq, timestamp, district, rep FROM pledges WHERE seq > ? "
+                                  "ORDER BY seq LIMIT ?", (seq, limit)).fetchall()
@@ -0,0 +1,262 @@
+import argparse
+import csv
+import os
+import resource
+import sys
+import time
+import numpy as np
+import pandas as pd
+import district_index
+import sheets_io
+
+# --- BULK IMPORT / EXPORT / BACKFILL TOOL ---
+# Streams pledges between the main sheet, the vault, the SQLite store and CSV
+# files in chunks, cleaning each chunk with vectorized pandas:
+#   - drops blank rows (",,,,") and rows without a usable email
+#   - lower-cases/strips emails and drops duplicates across everything seen,
+#     including what the destination already holds
+#   - parses timestamps in any common format (and Excel serial numbers);
+#     Excel-mangled values like "44:19.2" lost their date and are left blank
+#     unless --fallback-timestamp is given
+#   - rewrites districts like "ny14" / "NY 014" as "NY-14" (district_index) and
+#     flags codes that aren't real seats
+# Only the current chunk and an integer hash per email are held in memory.
+#
+#   python pledge_tool.py copy pledges.csv sqlite
+#   python pledge_tool.py copy sheet backup.csv
+#   python pledge_tool.py copy vault backup.csv --chunk-size 20000
+#   python pledge_tool.py check pledges.csv            (clean + report, write nothing)
+#
+# Locations: "sheet" (main sheet), "vault" (BACKUP_URL), "sqlite" (the pledge
+# store) or a path to a .csv file. Sheet access uses .streamlit/secrets.toml.
+# While SQLite is the primary store the sheets are its mirrors, so writes to
+# "sheet" or "vault" go into SQLite (its email dedup and the tallies see them)
+# and the app's sheet flusher copies them out to both sheets.
+CHUNK_SIZE = 50000
+SHEET_APPEND_ROWS = 5000    # rows per append request when writing to a sheet
+COLUMNS = sheets_io.COLUMNS
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# --- READERS: each yields DataFrames with the sheet columns as strings ---
+def read_csv(path, chunk_size):
+    for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False,
+                             skip_blank_lines=True, on_bad_lines="warn"):
+        yield chunk.reindex(columns=COLUMNS, fill_value="")
+
+
+def read_sheet(conn, spreadsheet, chunk_size):
+    ws = sheets_io.get_worksheet(conn, spreadsheet)
+    start = 2
+    while True:
+        values = sheets_io.get_values(ws, f"A{start}:E{start + chunk_size - 1}")
+        if not values:
+            return
+        yield pd.DataFrame([list(v) + [""] * (5 - len(v)) for v in values], columns=COLUMNS)
+        start += chunk_size
+
+
+def read_sqlite(store, chunk_size):
+    db = store._db()
+    last_seq = 0
+    while True:
+        rows = db.execute("SELECT seq, timestamp, name, email, district, rep FROM pledges "
+                          "WHERE seq > ? ORDER BY seq LIMIT ?", (last_seq, chunk_size)).fetchall()
+        if not rows:
+            return
+        last_seq = rows[-1][0]
+        yield pd.DataFrame([r[1:] for r in rows], columns=COLUMNS).fillna("")
+
+
+# --- WRITERS ---
+class CSVWriter:
+    def __init__(self, path):
+        self.path = path
+        self.header = not os.path.exists(path) or os.path.getsize(path) == 0
+
+    def write(self, df):
+        df.to_csv(self.path, mode="a", header=self.header, index=False, quoting=csv.QUOTE_MINIMAL)
+        self.header = False
+
+
+class SheetWriter:
+    def __init__(self, conn, spreadsheet):
+        self.conn = conn
+        self.spreadsheet = spreadsheet
+
+    def write(self, df):
+        records = df.to_dict("records")
+        for start in range(0, len(records), SHEET_APPEND_ROWS):
+            sheets_io.append_rows(self.conn, records[start:start + SHEET_APPEND_ROWS], spreadsheet=self.spreadsheet)
+
+
+class SQLiteWriter:
+    def __init__(self, store):
+        self.store = store
+
+    def write(self, df):
+        self.store.insert_rows(df.to_dict("records"))
+
+
+# --- CLEANING (vectorized per chunk) ---
+def clean_chunk(df, seen, stats, fallback_timestamp=None):
+    df = df.astype(str).apply(lambda col: col.str.strip())
+    blank = (df == "").all(axis=1)
+    stats["blank_rows"] += int(blank.sum())
+    df = df[~blank]
+
+    df["Email"] = df["Email"].str.lower()
+    bad_email = ~df["Email"].str.contains(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", regex=True)
+    stats["invalid_emails"] += int(bad_email.sum())
+    df = df[~bad_email]
+
+    # Dedup within the chunk and against every email seen before
+    hashes = pd.util.hash_pandas_object(df["Email"], index=False).to_numpy()
+    first_in_chunk = ~pd.Series(hashes).duplicated().to_numpy()
+    unseen = np.fromiter((h not in seen for h in hashes.tolist()), dtype=bool, count=len(hashes))
+    keep = first_in_chunk & unseen
+    stats["duplicates"] += int((~keep).sum())
+    df = df[keep]
+    seen.update(hashes[keep].tolist())
+
+    df["Timestamp"] = repair_timestamps(df["Timestamp"], stats, fallback_timestamp)
+    df["District"] = normalize_districts(df["District"], stats)
+    df["Name"] = df["Name"].str.replace(r"\s+", " ", regex=True)
+    df["Rep"] = df["Rep"].str.replace(r"\s+", " ", regex=True)
+    return df
+
+
+def repair_timestamps(raw, stats, fallback_timestamp=None):
+    parsed = pd.to_datetime(raw, format=TIMESTAMP_FORMAT, errors="coerce")
+    missing = parsed.isna() & (raw != "")
+    if missing.any():
+        # Any other date format (ISO with T, US m/d/Y, ...)
+        # (converted to parsed's unit: pandas 3 won't mix s/us/ns values in one column)
+        unit = parsed.dt.unit
+        parsed[missing] = pd.to_datetime(raw[missing], format="mixed", errors="coerce").dt.as_unit(unit)
+        # Excel serial day numbers (e.g. 45321.52)
+        serial = pd.to_numeric(raw, errors="coerce")
+        excel = parsed.isna() & serial.between(20000, 80000)
+        parsed[excel] = pd.to_datetime(serial[excel], unit="D", origin="1899-12-30").dt.round("s").dt.as_unit(unit)
+    # Bare "mm:ss.f" fragments parse as today's date: the real date is gone
+    fragment = raw.str.fullmatch(r"\d{1,2}:\d{2}(\.\d+)?")
+    parsed[fragment] = pd.NaT
+    stats["timestamps_repaired"] += int((parsed.notna() & (raw != parsed.dt.strftime(TIMESTAMP_FORMAT))).sum())
+    unrepairable = parsed.isna()
+    stats["timestamps_missing"] += int((raw == "").sum())
+    stats["timestamps_unrepairable"] += int((unrepairable & (raw != "")).sum())
+    out = parsed.dt.strftime(TIMESTAMP_FORMAT)
+    return out.where(~unrepairable, fallback_timestamp or "")
+
+
+def normalize_districts(raw, stats):
+    # "ny14", "NY 014", "New York 14" -> "NY-14"; "AK-0" / "AK-00" / "AK AL" -> "AK-AL"
+    # One index lookup per distinct value; codes that aren't real seats are kept as-is and counted
+    index = district_index.get_index()
+    code = raw.map({value: index.normalize_district(value) for value in raw.unique()})
+    valid = code.notna()
+    stats["districts_normalized"] += int((valid & (code != raw)).sum())
+    stats["invalid_districts"] += int((~valid & (raw != "")).sum())
+    return code.where(valid, raw)
+
+
+# --- LOCATIONS ---
+def _sheets_connection():
+    import streamlit as st
+    from streamlit_gsheets import GSheetsConnection
+    return st.connection("gsheets", type=GSheetsConnection), st.secrets.get("BACKUP_URL")
+
+
+def open_reader(location, chunk_size):
+    if location in ("sheet", "vault"):
+        conn, vault_url = _sheets_connection()
+        return read_sheet(conn, vault_url if location == "vault" else sheets_io.MAIN_SHEET, chunk_size)
+    if location == "sqlite":
+        import pledge_store
+        return read_sqlite(pledge_store.SQLiteStore(pledge_store.SQLITE_PATH), chunk_size)
+    return read_csv(location, chunk_size)
+
+
+def open_writer(location):
+    if location in ("sheet", "vault"):
+        conn, vault_url = _sheets_connection()
+        return SheetWriter(conn, vault_url if location == "vault" else sheets_io.MAIN_SHEET)
+    if location == "sqlite":
+        import pledge_store
+        store = pledge_store.SQLiteStore(pledge_store.SQLITE_PATH)
+        if not store.ready:
+            # Import the main sheet first, as the app does. Rows copied in before that import
+            # would end up behind the mirror checkpoints and never reach the sheets.
+            try:
+                store.ensure_ready(_sheets_connection()[0])
+            except Exception as e:
+                sys.exit(f"❌ Can't write to sqlite before it has imported the main sheet: {e}")
+        return SQLiteWriter(store)
+    return CSVWriter(location)
+
+
+def write_location(location):
+    # Where rows for `location` actually go (see the header comment)
+    import pledge_store
+    if location in ("sheet", "vault") and pledge_store.BACKEND == "sqlite":
+        print(f"⚠️ Writing to sqlite instead of {location}: the app's sheet flusher mirrors it "
+              f"to the main sheet and the vault", file=sys.stderr)
+        return "sqlite"
+    return location
+
+
+def copy(source, destination, chunk_size=CHUNK_SIZE, dedup_destination=True, fallback_timestamp=None):
+    stats = {key: 0 for key in ("read", "written", "blank_rows", "invalid_emails", "duplicates",
+                                "timestamps_repaired", "timestamps_missing", "timestamps_unrepairable",
+                                "districts_normalized", "invalid_districts")}
+    seen = set()
+    started = time.perf_counter()
+    if destination:
+        destination = write_location(destination)
+
+    # Emails the destination already has count as seen, so re-running a copy is safe
+    if destination and dedup_destination and (destination in ("sheet", "vault", "sqlite") or os.path.exists(destination)):
+        for chunk in open_reader(destination, chunk_size):
+            emails = chunk["Email"].astype(str).str.strip().str.lower()
+            seen.update(pd.util.hash_pandas_object(emails, index=False).tolist())
+
+    writer = open_writer(destination) if destination else None
+    for chunk in open_reader(source, chunk_size):
+        stats["read"] += len(chunk)
+        cleaned = clean_chunk(chunk, seen, stats, fallback_timestamp)
+        if writer is not None and len(cleaned):
+            writer.write(cleaned[COLUMNS])
+        stats["written"] += len(cleaned)
+        elapsed = time.perf_counter() - started
+        print(f"  {stats['read']:,} read, {stats['written']:,} kept ({stats['read'] / elapsed:,.0f} rows/s)",
+              file=sys.stderr)
+
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    stats["rows_per_s"] = round(stats["read"] / stats["seconds"]) if stats["seconds"] else None
+    stats["peak_memory_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk copy/clean pledge data.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    copy_cmd = sub.add_parser("copy", help="stream SOURCE into DESTINATION")
+    copy_cmd.add_argument("source")
+    copy_cmd.add_argument("destination")
+    check_cmd = sub.add_parser("check", help="clean SOURCE and report problems without writing")
+    check_cmd.add_argument("source")
+    for cmd in (copy_cmd, check_cmd):
+        cmd.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        cmd.add_argument("--fallback-timestamp", help="value for timestamps that can't be repaired")
+    copy_cmd.add_argument("--no-dedup-destination", dest="dedup_destination", action="store_false",
+                          help="don't skip emails the destination already has")
+    args = parser.parse_args()
+
+    stats = copy(args.source, getattr(args, "destination", None), args.chunk_size,
+                 getattr(args, "dedup_destination", False), args.fallback_timestamp)
+    for key, value in stats.items():
+        print(f"{key:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+
+# --- DEADLINES, RETRIES AND CIRCUIT BREAKERS FOR OUTBOUND CALLS ---
+# Every call to Geocodio, Nominatim, Google Sheets or SMTP goes through
+# call(dependency, fn, ...), which:
+#   - fails fast with CircuitOpen while that dependency's breaker is open,
+#   - retries transient failures (timeouts, dropped connections, 429, 5xx)
+#     with exponential backoff and full jitter, inside an overall deadline,
+#   - opens the breaker after FAILURES_TO_OPEN transient failures in a row and
+#     lets one probe call through after OPEN_SECONDS to see if it recovered.
+# The per-call timeout itself is passed to the client (requests/smtplib/gspread)
+# via timeout(dependency). Errors that mean "the service answered no" (4xx,
+# refused recipient) are raised straight away and count as a healthy answer.
+POLICIES = {
+    # timeout: seconds per attempt; deadline: total seconds including retries
+    "geocodio":  {"timeout": 10, "retries": 2, "deadline": 20, "failures_to_open": 5, "open_seconds": 30},
+    "nominatim": {"timeout": 5,  "retries": 1, "deadline": 8,  "failures_to_open": 5, "open_seconds": 30},
+    "sheets":    {"timeout": 30, "retries": 2, "deadline": 60, "failures_to_open": 5, "open_seconds": 60},
+    "smtp":      {"timeout": 30, "retries": 0, "deadline": 30, "failures_to_open": 3, "open_seconds": 120},
+}
+BASE_DELAY = 0.5
+MAX_DELAY = 8.0
+
+_breakers = {}
+_lock = threading.Lock()
+
+
+class CircuitOpen(Exception):
+    def __init__(self, dependency, retry_in):
+        super().__init__(f"{dependency} is unavailable (circuit open, next try in {retry_in:.0f}s)")
+        self.dependency = dependency
+        self.retry_in = retry_in
+
+
+class Breaker:
+    def __init__(self, name, failures_to_open, open_seconds):
+        self.name = name
+        self.failures_to_open = failures_to_open
+        self.open_seconds = open_seconds
+        self.state = "closed"       # closed -> open -> half_open -> closed / open
+        self.failures = 0           # transient failures in a row
+        self.opened_at = 0.0
+        self.probing = False
+        self.stats = {"calls": 0, "failures": 0, "retries": 0, "rejected": 0, "opened": 0}
+        self.last_error = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        # Raises CircuitOpen, or returns once the call may go ahead
+        with self.lock:
+            if self.state == "open":
+                retry_in = self.opened_at + self.open_seconds - time.monotonic()
+                if retry_in > 0:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpen(self.name, retry_in)
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self.probing:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpen(self.name, 0)
+                self.probing = True
+            self.stats["calls"] += 1
+
+    def success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+            self.probing = False
+
+    def failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.stats["failures"] += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            if self.state == "half_open" or self.failures >= self.failures_to_open:
+                if self.state != "open":
+                    self.stats["opened"] += 1
+                    print(f"⚠️ Circuit open for {self.name}: {self.last_error}")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def snapshot(self):
+        with self.lock:
+            retry_in = max(0.0, self.opened_at + self.open_seconds - time.monotonic()) if self.state == "open" else 0.0
+            return dict(self.stats, dependency=self.name, state=self.state, failures_in_a_row=self.failures,
+                        retry_in=round(retry_in), last_error=self.last_error)
+
+
+def breaker(dependency):
+    with _lock:
+        if dependency not in _breakers:
+            policy = POLICIES[dependency]
+            _breakers[dependency] = Breaker(dependency, policy["failures_to_open"], policy["open_seconds"])
+        return _breakers[dependency]
+
+
+def timeout(dependency):
+    return POLICIES[dependency]["timeout"]
+
+
+def backoff(attempt):
+    # Full jitter: anywhere between 0 and the exponential cap
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+
+
+def is_transient(error):
+    # Worth retrying (and a sign the dependency is unhealthy)?
+    status = getattr(getattr(error, "response", None), "status_code", None)   # requests, gspread
+    if status is not None:
+        return status == 429 or status >= 500
+    code = getattr(error, "smtp_code", None)
+    if code is not None:
+        return 400 <= code < 500
+    if hasattr(error, "recipients"):    # SMTPRecipientsRefused
+        return False
+    return isinstance(error, (OSError, TimeoutError))
+
+
+def call(dependency, fn, *args, retries=None, **kwargs):
+    # retries=0 for calls that must not be repeated blindly (e.g. sheet appends)
+    policy = POLICIES[dependency]
+    retries = policy["retries"] if retries is None else retries
+    cb = breaker(dependency)
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        cb.allow()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if not is_transient(e):
+                cb.success()
+                raise
+            cb.failure(e)
+            delay = backoff(attempt)
+            if attempt >= retries or time.monotonic() - started + delay + policy["timeout"] > policy["deadline"]:
+                raise
+            attempt += 1
+            with cb.lock:
+                cb.stats["retries"] += 1
+            time.sleep(delay)
+            continue
+        cb.success()
+        return result
+
+
+def status():
+    for dependency in POLICIES:
+        breaker(dependency)
+    with _lock:
+        breakers = list(_breakers.values())
+    return [b.snapshot() for b in breakers]
@@ -0,0 +1,201 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import admission
+import backup_service
+import metrics
+import pledge_store
+import sheets_io
+
+# --- BACKGROUND FLUSHER: PLEDGE STORE -> GOOGLE SHEETS ---
+# One daemon thread group-commits new pledges to the main sheet and the vault.
+# Each target keeps its own checkpoint, so a slow or broken vault never holds up
+# the main sheet (and vice versa). Failed batches are retried with backoff.
+# Both targets are written at the same time on a small pool, each with its own
+# deadline, so a flush takes as long as the slower write instead of the sum.
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 2.0    # seconds to wait for more pledges before flushing a batch
+MAX_BACKOFF = 300
+WRITE_TIMEOUT = {"main": 30, "vault": 30}   # seconds per append call
+# Same floor as the old safety lock: we already have 150+ signatures
+SAFETY_MIN_ROWS = {"main": 50}
+
+_connect = None        # returns the Sheets connection; called on the flusher's threads
+_conn = None
+_targets = {}           # target name -> spreadsheet (None = main sheet from secrets.toml)
+_state = {}             # target name -> status dict shown in the admin panel
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sheet-write")
+_thread = None
+_wake = threading.Event()
+_lock = threading.Lock()
+
+
+def start(connect, vault_url=None):
+    # Safe to call on every page load; only the first call starts the thread.
+    # connect() isn't called until there are rows to write.
+    global _connect, _thread
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _connect = connect
+        _targets["main"] = sheets_io.MAIN_SHEET
+        if vault_url:
+            _targets["vault"] = vault_url
+        for target in _targets:
+            _state.setdefault(target, {"flushed_seq": 0, "rows": None, "error": None,
+                                       "failures": 0, "retry_at": 0.0, "locked": False,
+                                       "in_flight": False})
+        _thread = threading.Thread(target=_run, name="sheet-flusher", daemon=True)
+        _thread.start()
+
+
+def wake():
+    _wake.set()
+
+
+def status():
+    with _lock:
+        return {target: dict(state) for target, state in _state.items()}
+
+
+def unlock(target):
+    # Admin override after a safety lock has been checked by hand
+    with _lock:
+        if target in _state:
+            _state[target]["locked"] = False
+            _state[target]["error"] = None
+    wake()
+
+
+class FlushResult:
+    # Which stores took the batch this round
+    def __init__(self):
+        self.committed = []
+        self.failed = []
+        self.timed_out = []
+        self.deferred = []
+        self.rows = 0
+
+    def __repr__(self):
+        return (f"FlushResult(rows={self.rows}, committed={self.committed}, "
+                f"failed={self.failed}, timed_out={self.timed_out}, deferred={self.deferred})")
+
+
+def flush_once():
+    # Write one batch per target, in parallel, each bounded by its deadline.
+    result = FlushResult()
+    store = pledge_store.get_store()
+    futures = {}
+    for target, spreadsheet in list(_targets.items()):
+        state = _state[target]
+        if state["locked"] or state["in_flight"] or time.monotonic() < state["retry_at"]:
+            continue
+        entries = store.pending(target, BATCH_SIZE)
+        if entries and not admission.try_acquire("sheets_write"):
+            # Sheets write quota used up for now: the rows stay pending for the next round
+            result.deferred.append(target)
+            continue
+        if entries:
+            future = _pool.submit(_write, target, spreadsheet, [entry["row"] for entry in entries])
+            futures[future] = (target, entries)
+
+    started = time.monotonic()
+    for future, (target, entries) in futures.items():
+        remaining = WRITE_TIMEOUT.get(target, 30) - (time.monotonic() - started)
+        done, _ = wait([future], timeout=max(0, remaining))
+        if not done:
+            # Still running: don't send the batch again until we know how it ended.
+            # _finish_late commits or requeues it once the call returns.
+            result.timed_out.append(target)
+            with _lock:
+                _state[target].update(in_flight=True, error=f"write exceeded {WRITE_TIMEOUT.get(target, 30)}s")
+            future.add_done_callback(lambda f, t=target, e=entries: _finish_late(f, t, e))
+        elif _finish(future, target, entries):
+            result.committed.append(target)
+            result.rows += len(entries)
+        else:
+            result.failed.append(target)
+    return result
+
+
+def _finish(future, target, entries):
+    # Returns True if the batch is in the sheet; otherwise it stays pending for a retry
+    try:
+        total = future.result()
+    except Exception as e:
+        _record_failure(target, e)
+        return False
+    # The batch is in the sheet: advance the checkpoint even if a safety check trips below
+    pledge_store.get_store().mark_flushed(target, entries[-1])
+    with _lock:
+        state = _state[target]
+        previous = state["rows"]
+        state.update(flushed_seq=entries[-1]["seq"], rows=total, error=None, failures=0, retry_at=0.0)
+    _check_row_count(target, previous, total, len(entries))
+    return True
+
+
+def _finish_late(future, target, entries):
+    try:
+        _finish(future, target, entries)
+    finally:
+        with _lock:
+            _state[target]["in_flight"] = False
+        wake()
+
+
+def _connection():
+    # Made on first write, off the script thread
+    global _conn
+    if _conn is None:
+        conn = _connect()
+        with _lock:
+            _conn = _conn or conn
+    return _conn
+
+
+def _write(target, spreadsheet, rows):
+    conn = _connection()
+    with metrics.span(f"flush.{target}"):
+        if target == "vault":
+            return backup_service.save_batch_to_vault(conn, rows, spreadsheet)
+        return sheets_io.append_rows(conn, rows, spreadsheet=spreadsheet)
+
+
+def _check_row_count(target, previous, total, batch_size):
+    # --- CRITICAL SAFETY LOCK ---
+    # Appends can't delete data, but a wrong/empty sheet or a sheet that shrank
+    # behind our back means a human should look before we write any more.
+    problem = None
+    if not total:
+        problem = "Sheet reported 0 rows after saving."
+    elif total < SAFETY_MIN_ROWS.get(target, 0):
+        problem = f"Sheet reported suspiciously few rows ({total})."
+    elif previous is not None and total < previous + batch_size:
+        problem = f"Sheet lost data. (Old: {previous}, New: {total})"
+    if problem:
+        print(f"⚠️ SAFETY LOCK ({target}): {problem} Flushing paused; pledges stay in the local store.")
+        with _lock:
+            _state[target].update(locked=True, error=problem)
+
+
+def _record_failure(target, error):
+    with _lock:
+        state = _state[target]
+        state["failures"] += 1
+        backoff = min(MAX_BACKOFF, 2 ** state["failures"])
+        state.update(error=str(error), retry_at=time.monotonic() + backoff)
+    print(f"❌ FLUSH FAILURE ({target}), retrying in {backoff}s: {error}")
+
+
+def _run():
+    while True:
+        _wake.wait(FLUSH_INTERVAL)
+        _wake.clear()
+        # Small pause so pledges arriving together go out in one batch
+        time.sleep(0.2)
+        try:
+            while flush_once().rows >= BATCH_SIZE:
+                pass
+        except Exception as e:
+            print(f"❌ FLUSHER ERROR: {e}")
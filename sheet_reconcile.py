@@ -0,0 +1,257 @@
+import hashlib
+import sqlite3
+import sys
+import threading
+import time
+import admission
+import backup_service
+import dedup_index
+import metrics
+import pledge_store
+import sheets_io
+
+# --- MAIN SHEET vs VAULT RECONCILIATION ---
+# Every row is hashed by (normalized email, timestamp). Rows are grouped into
+# blocks of BLOCK_ROWS sheet rows and each block keeps a checksum (row count +
+# sum of row hashes) in a small local SQLite index. A run only reads:
+#   - the tail of each sheet, from the last partial block on (new rows), and
+#   - VERIFY_BLOCKS older blocks, least recently checked first, so every block
+#     is re-verified over a few runs without downloading either sheet in full.
+# Blocks whose checksum changed are re-indexed; the diff itself is a local
+# query. Rows pending in the flusher are not reported as missing, and a row
+# whose email is on both sides with different timestamps (old code saved each
+# copy with its own clock) is reported as a mismatch but never copied.
+TARGETS = ("main", "vault")
+STATE_PATH = "reconcile_state.sqlite3"
+BLOCK_ROWS = 500
+VERIFY_BLOCKS = 20
+VERIFY_SECONDS = 10 * 60
+APPLY_BATCH = 500
+
+_db = None
+_lock = threading.Lock()
+_run_lock = threading.Lock()     # one run at a time (admin button vs background check)
+_running = False
+_last_report = None
+_attempted_at = 0.0
+
+
+class Report:
+    def __init__(self):
+        self.blocks_read = 0
+        self.blocks_changed = 0
+        self.rows = {}              # target -> rows indexed
+        self.missing = {}           # target -> rows the other side has and this one lacks
+        self.mismatched = []        # emails on both sides with different timestamps
+        self.pending = 0            # rows the flusher hasn't written yet (ignored)
+        self.applied = {}           # target -> rows appended by apply
+        self.finished_at = None
+
+    @property
+    def in_sync(self):
+        return not any(self.missing.values())
+
+    def summary(self):
+        missing = ", ".join(f"{len(rows)} missing from {target}" for target, rows in self.missing.items())
+        return (f"{missing}; {len(self.mismatched)} timestamp mismatches; "
+                f"{self.blocks_changed}/{self.blocks_read} blocks changed")
+
+
+def row_key(email, timestamp):
+    digest = hashlib.sha256(f"{dedup_index.normalize_email(email)}|{str(timestamp).strip()}".encode("utf-8"))
+    return int.from_bytes(digest.digest()[:8], "big", signed=True)
+
+
+def block_checksum(keys):
+    # Order-independent, and unlike XOR a repeated row still changes it
+    # (wrapped to a signed 64-bit int so SQLite can store it)
+    return (sum(keys) + 2 ** 63) % 2 ** 64 - 2 ** 63
+
+
+def run(conn, vault_url, apply=False):
+    # Returns a Report; with apply=True missing rows are appended to the side lacking them
+    global _last_report
+    spreadsheets = {"main": sheets_io.MAIN_SHEET, "vault": vault_url}
+    report = Report()
+    with _run_lock, metrics.span("reconcile.run"):
+        for target in TARGETS:
+            _scan(conn, target, spreadsheets[target], report)
+        _diff(report)
+        if apply:
+            for target in TARGETS:
+                report.applied[target] = _apply(conn, target, spreadsheets[target], report.missing[target])
+    report.finished_at = time.time()
+    with _lock:
+        _last_report = report
+    return report
+
+
+def maybe_run(connect, vault_url):
+    # Starts a background check (report only) at most every VERIFY_SECONDS.
+    # connect() returns the Sheets connection; it's called on the background thread.
+    global _running, _attempted_at
+    with _lock:
+        now = time.time()
+        if _running or now - _attempted_at < VERIFY_SECONDS:
+            return False
+        _running = True
+        _attempted_at = now
+    threading.Thread(target=_run_safely, args=(connect, vault_url), name="sheet-reconcile", daemon=True).start()
+    return True
+
+
+def last_report():
+    with _lock:
+        return _last_report
+
+
+def reset():
+    # Forget every checksum so the next run re-reads both sheets in full
+    db = _connect()
+    with _run_lock, db:
+        db.execute("DELETE FROM blocks")
+        db.execute("DELETE FROM rows")
+
+
+def _run_safely(connect, vault_url):
+    global _running
+    try:
+        report = run(connect(), vault_url)
+        if not report.in_sync:
+            print(f"⚠️ Main/vault differ: {report.summary()}")
+    except Exception as e:
+        metrics.count_error("reconcile")
+        print(f"❌ RECONCILE FAILED: {e}")
+    finally:
+        with _lock:
+            _running = False
+
+
+def _scan(conn, target, spreadsheet, report):
+    db = _connect()
+    ws = sheets_io.get_worksheet(conn, spreadsheet)
+    known = {block: (rows, checksum, checked_at) for block, rows, checksum, checked_at in
+             db.execute("SELECT block, rows, checksum, checked_at FROM blocks WHERE target = ?", (target,))}
+
+    # Tail: from the last indexed block until the sheet runs out
+    block = max(known) if known else 0
+    while True:
+        rows = _read_block(ws, block)
+        report.blocks_read += 1
+        _store_block(db, target, block, rows, known.get(block), report)
+        if len(rows) < BLOCK_ROWS:
+            break
+        block += 1
+    tail = block
+    # The sheet got shorter: anything indexed past the end is gone
+    with db:
+        db.execute("DELETE FROM blocks WHERE target = ? AND block > ?", (target, tail))
+        db.execute("DELETE FROM rows WHERE target = ? AND block > ?", (target, tail))
+
+    # Audit: re-check the least recently verified older blocks
+    stale = sorted((checked_at, b) for b, (_, _, checked_at) in known.items() if b < tail)[:VERIFY_BLOCKS]
+    for _, block in stale:
+        rows = _read_block(ws, block)
+        report.blocks_read += 1
+        _store_block(db, target, block, rows, known[block], report)
+
+    report.rows[target] = db.execute("SELECT COUNT(*) FROM rows WHERE target = ?", (target,)).fetchone()[0]
+
+
+def _read_block(ws, block):
+    first = 2 + block * BLOCK_ROWS
+    with metrics.span("sheets.read_block"):
+        values = sheets_io.get_values(ws, f"A{first}:E{first + BLOCK_ROWS - 1}")
+    # Trailing blank rows come back as [] and still count toward the block size
+    return [list(v) + [""] * (5 - len(v)) for v in values]
+
+
+def _store_block(db, target, block, rows, previous, report):
+    keyed = [(row_key(r[2], r[0]), r) for r in rows if str(r[2]).strip()]
+    checksum = block_checksum([key for key, _ in keyed])
+    # Rows counts blank lines too so block boundaries stay at fixed sheet rows
+    with db:
+        if previous is None or previous[0] != len(rows) or previous[1] != checksum:
+            report.blocks_changed += 1
+            db.execute("DELETE FROM rows WHERE target = ? AND block = ?", (target, block))
+            db.executemany(
+                "INSERT INTO rows (target, block, key, email_norm, timestamp, name, email, district, rep) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(target, block, key, dedup_index.normalize_email(r[2]), *r) for key, r in keyed])
+        db.execute("INSERT OR REPLACE INTO blocks (target, block, rows, checksum, checked_at) VALUES (?, ?, ?, ?, ?)",
+                   (target, block, len(rows), checksum, time.time()))
+
+
+def _diff(report):
+    db = _connect()
+    # Rows the flusher still has to write to a target aren't missing yet
+    pending = set()
+    store = pledge_store.get_store()
+    for target in TARGETS:
+        for entry in store.pending(target, 100000):
+            pending.add(row_key(entry["row"]["Email"], entry["row"]["Timestamp"]))
+    report.pending = len(pending)
+
+    for target, other in (("main", "vault"), ("vault", "main")):
+        missing = []
+        for key, email_norm, *row in db.execute(
+                "SELECT a.key, a.email_norm, a.timestamp, a.name, a.email, a.district, a.rep FROM rows a "
+                "WHERE a.target = ? AND NOT EXISTS (SELECT 1 FROM rows b WHERE b.target = ? AND b.key = a.key)",
+                (other, target)):
+            if key in pending:
+                continue
+            if db.execute("SELECT 1 FROM rows WHERE target = ? AND email_norm = ?", (target, email_norm)).fetchone():
+                if target == "main":
+                    report.mismatched.append(email_norm)
+                continue
+            missing.append(dict(zip(sheets_io.COLUMNS, row)))
+        report.missing[target] = missing
+
+
+def _apply(conn, target, spreadsheet, rows):
+    for start in range(0, len(rows), APPLY_BATCH):
+        batch = rows[start:start + APPLY_BATCH]
+        admission.acquire("sheets_write")
+        if target == "vault":
+            backup_service.save_batch_to_vault(conn, batch, spreadsheet)
+        else:
+            sheets_io.append_rows(conn, batch, spreadsheet=spreadsheet)
+    if rows:
+        print(f"✅ Copied {len(rows)} missing rows into {target}")
+    return len(rows)
+
+
+def _connect():
+    global _db
+    if _db is None:
+        _db = sqlite3.connect(STATE_PATH, check_same_thread=False)
+        _db.executescript("""
+            CREATE TABLE IF NOT EXISTS blocks (
+                target TEXT, block INTEGER, rows INTEGER, checksum INTEGER, checked_at REAL,
+                PRIMARY KEY (target, block)
+            );
+            CREATE TABLE IF NOT EXISTS rows (
+                target TEXT, block INTEGER, key INTEGER, email_norm TEXT,
+                timestamp TEXT, name TEXT, email TEXT, district TEXT, rep TEXT
+            );
+            CREATE INDEX IF NOT EXISTS rows_key ON rows (target, key);
+            CREATE INDEX IF NOT EXISTS rows_email ON rows (target, email_norm);
+            CREATE INDEX IF NOT EXISTS rows_block ON rows (target, block);
+        """)
+    return _db
+
+
+if __name__ == "__main__":
+    # python sheet_reconcile.py [--apply] [--full]   (uses .streamlit/secrets.toml)
+    import streamlit as st
+    from streamlit_gsheets import GSheetsConnection
+    if "--full" in sys.argv:
+        reset()
+    result = run(st.connection("gsheets", type=GSheetsConnection), st.secrets["BACKUP_URL"],
+                 apply="--apply" in sys.argv)
+    print(result.summary())
+    for target, rows in result.missing.items():
+        for row in rows[:20]:
+            print(f"  missing from {target}: {row['Timestamp']} {row['Email']}")
+    if result.applied:
+        print(f"Applied: {result.applied}")
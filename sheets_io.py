@@ -0,0 +1,107 @@
+import re
+import threading
+import metrics
+import resilience
+from datetime import datetime
+
+# --- SHEET LAYOUT ---
+# Column order of Sheet1 in both the main sheet and the vault.
+COLUMNS = ["Timestamp", "Name", "Email", "District", "Rep"]
+MAIN_SHEET = None  # None = the spreadsheet configured in secrets.toml
+WORKSHEET = "Sheet1"
+
+# Last row count each sheet reported after an append, so the anti-wipe
+# check can notice a sheet that shrank between two of our writes.
+_last_row_counts = {}
+_counts_lock = threading.Lock()
+# Opened worksheets: selecting one costs an open_by_url plus a metadata lookup
+# (two API calls), so it's done once per spreadsheet, not on every append.
+_worksheets = {}            # (id(conn), spreadsheet, worksheet) -> (conn, gspread Worksheet)
+
+
+def new_row(name, email, district, rep_name):
+    return {
+        "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "Name": name,
+        "Email": email,
+        "District": district,
+        "Rep": rep_name,
+    }
+
+
+def get_worksheet(conn, spreadsheet=None, worksheet=WORKSHEET):
+    # Raw gspread worksheet behind the Streamlit connection
+    # (requires service-account auth, same as conn.update).
+    key = (id(conn), spreadsheet, worksheet)
+    with _counts_lock:
+        cached = _worksheets.get(key)
+    if cached is not None and cached[0] is conn:
+        return cached[1]
+    _set_timeout(conn)
+    ws = resilience.call("sheets", conn.client._select_worksheet, spreadsheet=spreadsheet, worksheet=worksheet)
+    with _counts_lock:
+        _worksheets[key] = (conn, ws)
+    return ws
+
+
+def forget_worksheet(conn, spreadsheet=None, worksheet=WORKSHEET):
+    # After a failed write: select the worksheet afresh next time (it may have been renamed or recreated)
+    with _counts_lock:
+        _worksheets.pop((id(conn), spreadsheet, worksheet), None)
+
+
+def get_values(ws, range_name):
+    # Reads are safe to retry
+    return resilience.call("sheets", ws.get_values, range_name)
+
+
+def append_rows(conn, rows, spreadsheet=None, worksheet=WORKSHEET):
+    # APPEND-ONLY WRITE: sends just the new rows instead of re-uploading the sheet.
+    # Returns the number of data rows (header excluded) the sheet holds afterwards.
+    if not rows:
+        return last_row_count(spreadsheet, worksheet)
+    values = [[_cell(row.get(col)) for col in COLUMNS] for row in rows]
+    with metrics.span("sheets.append"):
+        ws = get_worksheet(conn, spreadsheet, worksheet)
+        # No retries: a timed-out append may still have landed, resending could duplicate it
+        try:
+            response = resilience.call(
+                "sheets",
+                ws.append_rows,
+                values,
+                value_input_option="RAW",
+                insert_data_option="INSERT_ROWS",
+                table_range="A1",
+                retries=0,
+            )
+        except Exception:
+            forget_worksheet(conn, spreadsheet, worksheet)
+            raise
+    total = _row_count_from_range(response["updates"]["updatedRange"])
+    with _counts_lock:
+        _last_row_counts[(spreadsheet, worksheet)] = total
+    return total
+
+
+def last_row_count(spreadsheet=None, worksheet=WORKSHEET):
+    with _counts_lock:
+        return _last_row_counts.get((spreadsheet, worksheet))
+
+
+def _row_count_from_range(updated_range):
+    # "Sheet1!A152:E153" -> row 153 is the last one written; row 1 is the header.
+    match = re.search(r"(\d+)$", updated_range)
+    if not match:
+        raise ValueError(f"Unexpected append range: {updated_range}")
+    return int(match.group(1)) - 1
+
+
+def _set_timeout(conn):
+    # gspread waits forever by default; give every Sheets request a deadline
+    client = getattr(conn.client, "_client", None)
+    if client is not None and hasattr(client, "set_timeout"):
+        client.set_timeout(resilience.timeout("sheets"))
+
+
+def _cell(value):
+    return "" if value is None else value
@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import Counter
+import pledge_store
+
+# --- SIGNATURE COUNTERS ---
+# Total signatures plus counts per District, state and Rep, kept in memory.
+# The commit writer bumps them as pledges are saved; a background job rebuilds
+# them from the pledge store every RECONCILE_SECONDS so they can't drift.
+# Reads never touch the sheet.
+RECONCILE_SECONDS = 15 * 60
+RETRY_SECONDS = 60          # wait between attempts while the sheet can't be read
+
+_total = 0
+_by_district = Counter()
+_by_state = Counter()
+_by_rep = Counter()
+_reconciled_at = None       # wall-clock time of the last successful rebuild
+_reconciling = False
+_attempted_at = 0.0
+_recent = []                # (seq, row) recorded while a rebuild is running
+_lock = threading.Lock()
+
+
+def district_key(district):
+    return str(district or "").strip().upper()
+
+
+def state_of(district):
+    return district_key(district).split("-")[0]
+
+
+def rep_key(rep_name):
+    return " ".join(str(rep_name or "").split())
+
+
+def record(row, seq=None):
+    # One saved pledge
+    global _total
+    with _lock:
+        _add(row)
+        _total += 1
+        if _reconciling:
+            _recent.append((seq, row))
+
+
+def snapshot(top=None):
+    with _lock:
+        return {
+            "total": _total,
+            "by_district": _by_district.most_common(top),
+            "by_state": _by_state.most_common(top),
+            "by_rep": _by_rep.most_common(top),
+            "reconciled_at": _reconciled_at,
+        }
+
+
+def maybe_reconcile(connect):
+    # Starts a background rebuild if the counters are missing or older than RECONCILE_SECONDS.
+    # connect() returns the Sheets connection; it's called on the background thread.
+    global _reconciling, _attempted_at
+    with _lock:
+        now = time.time()
+        due = _reconciled_at is None or now - _reconciled_at > RECONCILE_SECONDS
+        if not due or _reconciling or now - _attempted_at < RETRY_SECONDS:
+            return False
+        _reconciling = True
+        _attempted_at = now
+        _recent.clear()
+    threading.Thread(target=_reconcile_safely, args=(connect,), name="tallies-reconcile", daemon=True).start()
+    return True
+
+
+def reconcile(conn):
+    # Rebuild from every pledge the store holds up to some sequence number
+    global _total, _by_district, _by_state, _by_rep, _reconciled_at
+    rows, last_seq = pledge_store.get_store().tally_rows(conn)
+
+    with _lock:
+        _by_district, _by_state, _by_rep = Counter(), Counter(), Counter()
+        for row in rows:
+            _add(row)
+        _total = len(rows)
+        # Pledges committed after the store was read
+        for seq, row in _recent:
+            if seq is None or seq > last_seq:
+                _add(row)
+                _total += 1
+        _recent.clear()
+        _reconciled_at = time.time()
+    return _total
+
+
+def _add(row):
+    # Caller holds _lock
+    district = district_key(row.get("District"))
+    if district:
+        _by_district[district] += 1
+        _by_state[state_of(district)] += 1
+    rep = rep_key(row.get("Rep"))
+    if rep:
+        _by_rep[rep] += 1
+
+
+def _store_ready(conn):
+    # The store just imported the sheet: rebuild now rather than at the next interval
+    global _reconciled_at, _attempted_at
+    with _lock:
+        _reconciled_at, _attempted_at = None, 0.0
+    maybe_reconcile(lambda: conn)
+
+
+def _reconcile_safely(connect):
+    global _reconciling
+    try:
+        total = reconcile(connect())
+        print(f"✅ Tallies reconciled: {total} signatures")
+    except Exception as e:
+        print(f"❌ TALLY RECONCILE FAILED: {e}")
+    finally:
+        with _lock:
+            _reconciling = False
+
+
+pledge_store.on_ready(_store_ready)
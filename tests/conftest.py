@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules live at the repo root, not in a package; the stand-ins are in benchmarks/
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+@pytest.fixture
+def sheet():
+    # In-memory main sheet with 60 signatures already in it, no latency
+    import fakes
+    return fakes.FakeGSheetsConnection(rows=60, latency=0.0)
+
+
+@pytest.fixture
+def store(tmp_path, sheet, monkeypatch):
+    # A fresh SQLite store that has imported `sheet`, installed as the app's store
+    import pledge_store
+    monkeypatch.setattr(pledge_store, "_ready_callbacks", [])
+    store = pledge_store.SQLiteStore(str(tmp_path / "pledges.sqlite3"))
+    store.ensure_ready(sheet)
+    monkeypatch.setattr(pledge_store, "_store", store)
+    return store
+
+
+def pledge(email, district="NY-14", rep="Alexandria Ocasio-Cortez"):
+    return {"Timestamp": "2025-06-01 12:00:00", "Name": "Test Signer", "Email": email,
+            "District": district, "Rep": rep}
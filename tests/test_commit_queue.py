@@ -0,0 +1,63 @@
+import threading
+
+import commit_queue
+from conftest import pledge
+
+
+def _gate(store, monkeypatch):
+    # Holds the writer inside its first commit until released; records batch sizes
+    entered, release, batches = threading.Event(), threading.Event(), []
+    commit = store.commit
+
+    def gated(rows):
+        batches.append(len(rows))
+        entered.set()
+        release.wait(5)
+        return commit(rows)
+
+    monkeypatch.setattr(store, "commit", gated)
+    return entered, release, batches
+
+
+def test_signers_waiting_on_a_commit_share_the_next_one(store, monkeypatch):
+    entered, release, batches = _gate(store, monkeypatch)
+    first = commit_queue.submit(pledge("first@example.com"))
+    assert entered.wait(5)
+    waiting = [commit_queue.submit(pledge(f"signer{i}@example.com")) for i in range(5)]
+    release.set()
+
+    assert all(ack.wait(5) and ack.ok for ack in [first] + waiting)
+    assert batches == [1, 5]
+    assert [ack.seq for ack in waiting] == sorted(ack.seq for ack in waiting)
+
+
+def test_duplicate_email_is_acked_as_duplicate(store):
+    seed = commit_queue.submit(pledge(" Seed3@Example.com"))
+    new = commit_queue.submit(pledge("new@example.com"))
+    again = commit_queue.submit(pledge("NEW@example.com "))
+
+    for ack in (seed, new, again):
+        assert ack.wait(5)
+    assert seed.duplicate and seed.seq is None and not seed.ok
+    assert new.ok and not new.duplicate
+    assert again.duplicate and not again.ok
+
+
+def test_store_error_is_acked_to_every_waiter(store, monkeypatch):
+    failing, commit = [True], store.commit
+
+    def flaky(rows):
+        if failing:
+            raise OSError("disk full")
+        return commit(rows)
+
+    monkeypatch.setattr(store, "commit", flaky)
+    acks = [commit_queue.submit(pledge(f"err{i}@example.com")) for i in range(3)]
+    for ack in acks:
+        assert ack.wait(5)
+        assert isinstance(ack.error, OSError) and not ack.ok
+
+    # The writer keeps going after a failed batch
+    failing.clear()
+    later = commit_queue.submit(pledge("later@example.com"))
+    assert later.wait(5) and later.ok
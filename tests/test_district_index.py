@@ -0,0 +1,64 @@
+import csv
+
+import pytest
+
+import district_index
+
+
+@pytest.fixture(scope="module")
+def index():
+    # The bundled seat list with a fixed set of members, so the tests don't follow elections
+    with open(district_index.DISTRICTS_PATH, newline="", encoding="utf-8") as f:
+        districts = list(csv.DictReader(f))
+    return district_index.DistrictIndex(districts, {
+        "NY-14": "Alexandria Ocasio-Cortez", "IL-12": "Mike Bost", "OH-15": "Mike Carey",
+        "AK-AL": "Nick Begich", "NY-15": "Vacant"})
+
+
+@pytest.mark.parametrize("raw, code", [
+    ("ny14", "NY-14"),
+    ("NY-014", "NY-14"),
+    (" ny 14 ", "NY-14"),
+    ("New York 14", "NY-14"),
+    ("14th district of New York", "NY-14"),
+    ("New York's 14th", "NY-14"),
+    ("AK-0", "AK-AL"),
+    ("AK-00", "AK-AL"),
+    ("ak", "AK-AL"),
+    ("Alaska at large", "AK-AL"),
+    ("DC-98", "DC-AL"),
+    ("PR-98", "PR-AL"),
+    ("NY-0", None),         # NY has no at-large seat
+    ("NY-98", None),
+    ("NY-27", None),
+    ("ZZ-1", None),
+    ("", None),
+    (None, None),
+])
+def test_normalize_district(index, raw, code):
+    assert index.normalize_district(raw) == code
+
+
+def test_canonical_uses_the_seats_member(index):
+    assert index.canonical("ny14", "aoc") == ("NY-14", "Alexandria Ocasio-Cortez")
+    assert index.canonical("Alaska at large", "") == ("AK-AL", "Nick Begich")
+
+
+def test_canonical_without_a_known_member_keeps_the_typed_name(index):
+    assert index.rep_for("NY-15") is None     # "Vacant" isn't a member
+    assert index.canonical("NY-15", "  Ritchie   Torres ") == ("NY-15", "Ritchie Torres")
+
+
+def test_canonical_rejects_unknown_districts(index):
+    assert index.canonical("NY-27", "Someone") == (None, None)
+
+
+def test_suggest_reps_handles_typos_and_prefers_the_district(index):
+    assert index.suggest_reps("ocasio cortex")[0][:2] == ("Alexandria Ocasio-Cortez", "NY-14")
+    assert index.suggest_reps("mike", "OH-15")[0][:2] == ("Mike Carey", "OH-15")
+
+
+def test_conflicting_rep(index):
+    assert index.conflicting_rep("NY-14", "Rep. Mike Bost") == ("Mike Bost", "IL-12")
+    assert index.conflicting_rep("NY-14", "Mike") is None      # a shared first name isn't a conflict
+    assert index.conflicting_rep("NY-14", "Alexandria Ocasio-Cortez") is None
@@ -0,0 +1,34 @@
+import json
+
+import numpy as np
+
+import district_resolver
+
+
+def _square(x, y, size):
+    # Clockwise, like a shapefile outer ring
+    return [[x, y], [x, y + size], [x + size, y + size], [x + size, y], [x, y]]
+
+
+def test_census_water_features_are_skipped(tmp_path):
+    features = [{"type": "Feature", "properties": {"STATEFP": "36", "CD119FP": code},
+                 "geometry": {"type": "Polygon", "coordinates": [_square(x, 40, 1)]}}
+                for code, x in (("14", -75), ("ZZ", -73), ("98", -71))]
+    path = tmp_path / "cd.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+    resolver = district_resolver.DistrictResolver.from_files(str(path), reps_path=None)
+
+    assert resolver.codes == ["NY-14", "NY-AL"]
+    assert resolver.district_at(40.5, -74.5) == "NY-14"
+    assert resolver.district_at(40.5, -72.5) is None
+
+
+def test_simplify_drops_points_within_tolerance():
+    t = np.linspace(0, np.pi, 1000)
+    ring = np.c_[t, 0.0001 * np.sin(50 * t)]
+
+    simplified = district_resolver._simplify(ring, 0.001)
+
+    assert len(simplified) == 2
+    assert (simplified[0] == ring[0]).all() and (simplified[-1] == ring[-1]).all()
@@ -0,0 +1,60 @@
+import pytest
+
+import fakes
+import pledge_store
+from conftest import pledge
+
+
+@pytest.fixture
+def empty_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(pledge_store, "_ready_callbacks", [])
+    return pledge_store.SQLiteStore(str(tmp_path / "pledges.sqlite3"))
+
+
+def test_short_sheet_read_is_not_imported(empty_store):
+    conn = fakes.FakeGSheetsConnection(rows=60, latency=0.0)
+    # 60 rows, but only 49 with an email: looks like a truncated read
+    for row in conn.sheet().rows[50:]:
+        row[2] = ""
+
+    with pytest.raises(pledge_store.StoreUnavailable, match="only 49 signatures"):
+        empty_store.ensure_ready(conn)
+    assert not empty_store.ready
+    with pytest.raises(pledge_store.StoreUnavailable):
+        empty_store.insert_rows([pledge("early@example.com")])
+    with pytest.raises(pledge_store.StoreUnavailable):
+        empty_store.rows_after(0, 10)
+
+
+def test_import_marks_sheet_rows_as_already_mirrored(empty_store, monkeypatch):
+    conn = fakes.FakeGSheetsConnection(rows=50, latency=0.0)
+    ready = []
+    monkeypatch.setattr(pledge_store, "_ready_callbacks", [ready.append])
+
+    empty_store.ensure_ready(conn)
+
+    assert empty_store.ready and ready == [conn]
+    assert empty_store.pending("main", 100) == [] and empty_store.pending("vault", 100) == []
+    assert pledge_store.SQLiteStore(empty_store.path).ready     # survives a restart
+
+
+def test_unique_email_index(store, sheet):
+    assert store.is_duplicate(sheet, " SEED7@example.com")
+    assert not store.is_duplicate(sheet, "new@example.com")
+
+    seqs = store.commit([pledge("new@example.com"), pledge("Seed7@Example.com"), pledge("NEW@example.com")])
+
+    assert seqs[0] is not None and seqs[1:] == [None, None]
+    assert store.is_duplicate(sheet, "New@Example.com")
+
+
+def test_pending_and_mark_flushed_per_target(store):
+    store.commit([pledge(f"p{i}@example.com") for i in range(3)])
+
+    entries = store.pending("main", 10)
+    assert [e["row"]["Email"] for e in entries] == ["p0@example.com", "p1@example.com", "p2@example.com"]
+    assert store.pending("main", 2) == entries[:2]
+
+    store.mark_flushed("main", entries[1])
+    assert store.pending("main", 10) == entries[2:]
+    assert store.pending("vault", 10) == entries
@@ -0,0 +1,22 @@
+import pandas as pd
+import pledge_tool
+
+
+def _stats():
+    return {"timestamps_repaired": 0, "timestamps_missing": 0, "timestamps_unrepairable": 0}
+
+
+def test_excel_serial_with_time():
+    stats = _stats()
+    out = pledge_tool.repair_timestamps(pd.Series(["45321.52"]), stats)
+    assert out.tolist() == ["2024-01-30 12:28:48"]
+    assert stats["timestamps_repaired"] == 1
+
+
+def test_mixed_formats_in_one_chunk():
+    raw = pd.Series(["2024-01-05 10:00:00", "2024-01-05T10:00:00", "1/2/2024 3:04 PM", "45321", "", "44:19.2"])
+    stats = _stats()
+    out = pledge_tool.repair_timestamps(raw, stats, fallback_timestamp="2020-01-01 00:00:00")
+    assert out.tolist() == ["2024-01-05 10:00:00", "2024-01-05 10:00:00", "2024-01-02 15:04:00",
+                            "2024-01-30 00:00:00", "2020-01-01 00:00:00", "2020-01-01 00:00:00"]
+    assert stats == {"timestamps_repaired": 3, "timestamps_missing": 1, "timestamps_unrepairable": 1}
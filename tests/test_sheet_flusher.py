@@ -0,0 +1,53 @@
+import pytest
+
+import sheet_flusher
+from conftest import pledge
+
+
+@pytest.fixture
+def flusher(store, sheet, monkeypatch):
+    # Targets and state set up as start() does, without the background thread
+    monkeypatch.setattr(sheet_flusher, "_connect", lambda: sheet)
+    monkeypatch.setattr(sheet_flusher, "_conn", None)
+    monkeypatch.setattr(sheet_flusher, "_targets", {"main": None, "vault": "vault"})
+    monkeypatch.setattr(sheet_flusher, "_state", {
+        target: {"flushed_seq": 0, "rows": None, "error": None, "failures": 0, "retry_at": 0.0,
+                 "locked": False, "in_flight": False} for target in ("main", "vault")})
+    sheet.sheet("vault")
+    return sheet_flusher
+
+
+@pytest.mark.parametrize("target, previous, total, batch, locked", [
+    ("main", None, 0, 1, True),             # empty sheet after saving
+    ("main", None, 49, 1, True),            # fewer rows than the safety floor
+    ("vault", None, 49, 1, False),          # the floor is for the main sheet only
+    ("main", 100, 104, 5, True),            # shrank behind our back
+    ("main", 100, 105, 5, False),
+    ("main", 100, 110, 5, False),           # someone else appended too
+])
+def test_check_row_count(flusher, target, previous, total, batch, locked):
+    flusher._check_row_count(target, previous, total, batch)
+
+    state = flusher.status()[target]
+    assert state["locked"] is locked
+    assert bool(state["error"]) is locked
+
+
+def test_locked_target_is_skipped_until_unlocked(flusher, store, sheet, monkeypatch):
+    monkeypatch.setattr(flusher, "wake", lambda: None)
+    store.commit([pledge("a@example.com"), pledge("b@example.com")])
+    result = flusher.flush_once()
+    assert sorted(result.committed) == ["main", "vault"] and store.pending("main", 10) == []
+
+    # The main sheet loses rows: the next batch trips the lock and nothing more is written
+    del sheet.sheet().rows[10:20]
+    store.commit([pledge("c@example.com")])
+    flusher.flush_once()
+    assert flusher.status()["main"]["locked"]
+    store.commit([pledge("d@example.com")])
+    assert flusher.flush_once().committed == ["vault"]
+    assert [e["row"]["Email"] for e in store.pending("main", 10)] == ["d@example.com"]
+
+    flusher.unlock("main")
+    assert flusher.flush_once().committed == ["main"]
+    assert sheet.sheet().rows[-1][2] == "d@example.com"